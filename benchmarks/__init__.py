@@ -0,0 +1 @@
+"""This module contains benchmarks for the trainer hot paths."""
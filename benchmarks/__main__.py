@@ -0,0 +1,190 @@
+"""Run the benchmarks of the trainer hot paths and write the results to a json file."""
+
+import argparse
+import pathlib
+import tempfile
+from contextvars import copy_context
+
+from dash._callback_context import context_value
+
+from benchmarks.utils import (
+    MODES,
+    MOVES,
+    compare_results,
+    database,
+    import_time,
+    measure,
+    metadata,
+    save_results,
+    seed_all,
+    training_data,
+)
+from src.app import game_callbacks, ui_callbacks
+from src.basic_strategy.card_eval import card_eval
+from src.basic_strategy.hand import Card, Hand
+from src.basic_strategy.mode_selector import deal_solo_cards
+from src.stats.create_plots import (
+    filter_data,
+    get_data,
+    main_plot,
+    plot_figure,
+    set_optional_lists,
+    transform_data,
+)
+from src.stats.dataset import add_plot_columns
+from src.storage.buffer import AnswerBuffer
+from src.storage.columnar import AnswerLog
+
+
+def startup_benchmarks() -> list[dict]:
+    """Time importing the strategy code, the command line trainer and the dash app.
+
+    Returns:
+        list[dict]: benchmark results
+    """
+    modules = ["src.basic_strategy.card_eval", "src.basic_strategy.__main__", "src.app.app"]
+    return [import_time(module) for module in modules]
+
+
+def strategy_benchmarks() -> list[dict]:
+    """Time the strategy evaluation, hand creation and dealing.
+
+    Returns:
+        list[dict]: benchmark results
+    """
+    hand, dealer = Hand.from_string("As7d"), Card("s", "9")
+    cards = Hand.from_string("As4sAd").cards
+    return [
+        measure("card_eval", lambda: card_eval(hand, dealer, "basic"), number=100_000),
+        measure("Hand.__init__", lambda: Hand(cards), number=100_000),
+        measure("Hand.compute_value", hand.compute_value, number=100_000),
+        measure("Hand.from_string", lambda: Hand.from_string("As7d", "11"), number=100_000),
+        measure("deal_solo_cards basic", lambda: deal_solo_cards("basic"), number=100_000),
+        measure("deal_solo_cards count", lambda: deal_solo_cards("count"), number=100_000),
+    ]
+
+
+def answer_benchmarks(directory: pathlib.Path, seed: int) -> list[dict]:
+    """Time answering a hand in the app and writing the queued answers.
+
+    Args:
+        directory (pathlib.Path): directory for the benchmark database
+        seed (int): random seed
+
+    Returns:
+        list[dict]: benchmark results
+    """
+    game_callbacks.ANSWER_BUFFER = AnswerBuffer(database(directory / "answers.sqlite", 1000, seed))
+    data = [{"owner": 0, "hands": "Kc9h", "face_up": "10"}, {"owner": 1, "hands": "4sJc", "face_up": "11"}]
+
+    def answer() -> list:
+        context_value.set({"triggered_inputs": [{"prop_id": "h.n_clicks"}]})
+        return game_callbacks.eval_action([], 1, data, "bench_user", "basic")
+
+    results = [measure("eval_action", lambda: copy_context().run(answer), number=200)]
+    results.append(measure("AnswerBuffer.flush", game_callbacks.ANSWER_BUFFER.flush, repeat=1))
+    game_callbacks.ANSWER_BUFFER.close()
+    return results
+
+
+def dashboard_benchmarks(directory: pathlib.Path, sizes: list[int], seed: int) -> list[dict]:
+    """Time loading the dashboard data and plotting it for different table sizes.
+
+    Args:
+        directory (pathlib.Path): directory for the benchmark databases
+        sizes (list[int]): number of rows in the training_data table
+        seed (int): random seed
+
+    Returns:
+        list[dict]: benchmark results
+    """
+    results = []
+    for size in sizes:
+        engine = database(directory / f"dashboard_{size}.sqlite", size, seed)
+        repeat = 3 if size < 10**6 else 1
+        results.append(measure("get_data", lambda: get_data(engine), repeat=repeat, size=size))
+        results.append(
+            measure("load_data tick", lambda: ui_callbacks.load_data(0, None, engine), repeat=repeat, size=size)
+        )
+        data = get_data(engine).to_dict("records")
+        results.append(measure("main_plot", lambda: main_plot(data), repeat=repeat, size=size))
+        results.append(
+            measure(
+                "main_plot split",
+                lambda: main_plot(data, ["user1", "user2"], ["basic", "soft"], ["s", "h", "d"], False),
+                repeat=repeat,
+                size=size,
+            )
+        )
+        results.append(measure("main_plot sql", lambda: main_plot(engine=engine), repeat=repeat, size=size))
+        results.append(
+            measure(
+                "main_plot sql split",
+                lambda: main_plot(None, ["user1", "user2"], ["basic", "soft"], ["s", "h", "d"], False, engine),
+                repeat=repeat,
+                size=size,
+            )
+        )
+        engine.dispose()
+        log = AnswerLog(directory / f"answers_{size}")
+        log.append(training_data(size, seed))
+        results.append(measure("AnswerLog.frame", log.frame, repeat=repeat, size=size))
+        results.append(measure("AnswerLog.aggregate", lambda: log.aggregate(["date"]), repeat=repeat, size=size))
+        results.append(
+            measure(
+                "AnswerLog.aggregate split",
+                lambda: log.aggregate(
+                    ["date", "user", "correct_move", "training_type"],
+                    ["user1", "user2"],
+                    ["basic", "soft"],
+                    ["s", "h", "d"],
+                ),
+                repeat=repeat,
+                size=size,
+            )
+        )
+    return results
+
+
+def plot_benchmarks(seed: int, rows: int = 10**6) -> list[dict]:
+    """Time building the dashboard figures split by 100 users, 4 modes and 7 moves.
+
+    Args:
+        seed (int): random seed
+        rows (int, optional): number of raw rows. Defaults to 10**6.
+
+    Returns:
+        list[dict]: benchmark results
+    """
+    users = [f"user{i}" for i in range(100)]
+    modes = MODES[:4]
+    dataframe = add_plot_columns(training_data(rows, seed, users, modes))
+    group_list, data_column = set_optional_lists(True, True, True, False)
+    aggregated = transform_data(filter_data(dataframe, users, modes, MOVES), group_list)
+    return [
+        measure(
+            "plot_figure split",
+            lambda: plot_figure(aggregated, data_column, users, modes, MOVES),
+            repeat=3,
+            size=rows,
+        )
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10**4, 10**5, 10**6])
+    parser.add_argument("--output", type=pathlib.Path, default=pathlib.Path("bench_results.json"))
+    parser.add_argument("--compare", type=pathlib.Path, default=None, help="earlier result file to compare with")
+    args = parser.parse_args()
+    seed_all(args.seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = startup_benchmarks()
+        results += strategy_benchmarks()
+        results += answer_benchmarks(pathlib.Path(tmp_dir), args.seed)
+        results += dashboard_benchmarks(pathlib.Path(tmp_dir), args.sizes, args.seed)
+        results += plot_benchmarks(args.seed)
+    save_results(args.output, metadata(args.seed), results)
+    if args.compare:
+        compare_results(args.compare, results)
@@ -0,0 +1,58 @@
+"""Compare the vectorized batch evaluation to evaluating row by row."""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.basic_strategy.card_eval import card_eval, card_eval_batch
+from src.basic_strategy.hand import CARD_VALS, Card, Hand
+
+RANKS = list(CARD_VALS)
+
+
+def per_row(card1: np.ndarray, card2: np.ndarray, dealer_card: np.ndarray) -> list[str]:
+    """Grade every row by building Hand and Card objects.
+
+    Args:
+        card1 (np.ndarray): rank of the first player card
+        card2 (np.ndarray): rank of the second player card
+        dealer_card (np.ndarray): dealer upcard rank
+
+    Returns:
+        list[str]: optimal choice per row
+    """
+    return [
+        card_eval(Hand([Card("s", c1), Card("h", c2)]), Card("d", d), "basic")
+        for c1, c2, d in zip(card1, card2, dealer_card)
+    ]
+
+
+def main(rows: int, seed: int) -> None:
+    """Time both evaluation paths on random hands.
+
+    Args:
+        rows (int): number of hands to evaluate
+        seed (int): random seed
+    """
+    rng = np.random.default_rng(seed)
+    card1, card2, dealer_card = rng.choice(RANKS, size=(3, rows))
+    start = time.perf_counter()
+    batch = card_eval_batch(card1, card2, dealer_card)
+    batch_time = time.perf_counter() - start
+    start = time.perf_counter()
+    single = per_row(card1, card2, dealer_card)
+    row_time = time.perf_counter() - start
+    assert batch.tolist() == single
+    print(f"rows: {rows}")
+    print(f"card_eval_batch: {batch_time:.3f}s ({rows / batch_time:,.0f} rows/s)")
+    print(f"card_eval per row: {row_time:.3f}s ({rows / row_time:,.0f} rows/s)")
+    print(f"speedup: {row_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10**6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.rows, args.seed)
@@ -0,0 +1,48 @@
+"""Measure time and memory for creating and dealing one million cards."""
+
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Callable
+
+from src.basic_strategy.hand import CARD_VALS, SUIT_UNICODE, Card
+from src.basic_strategy.mode_selector import deal_solo_cards
+
+
+def measure(name: str, func: Callable[[], list]) -> None:
+    """Print run time and peak traced memory of a function.
+
+    Args:
+        name (str): benchmark name
+        func (Callable[[], list]): function creating the cards, the result is kept alive while measuring
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    cards = func()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: {len(cards):,} cards in {duration:.3f}s, peak memory {peak / 2**20:.1f} MiB")
+
+
+def main(cards: int, seed: int) -> None:
+    """Parse and deal the given number of cards.
+
+    Args:
+        cards (int): number of cards
+        seed (int): random seed
+    """
+    random.seed(seed)
+    card_strs = [f"{rank}{suit}" for rank in CARD_VALS for suit in SUIT_UNICODE]
+    strings = random.choices(card_strs, k=cards)
+    measure("Card.from_string", lambda: [Card.from_string(card_str) for card_str in strings])
+    measure("deal_solo_cards", lambda: [card for _ in range(cards // 4) for card in deal_solo_cards("basic")])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cards", type=int, default=10**6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.cards, args.seed)
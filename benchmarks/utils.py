@@ -0,0 +1,217 @@
+"""This script contains helpers to time functions, create test data and store benchmark results."""
+
+import datetime
+import json
+import pathlib
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+from src import TABLE_DTYPES, ensure_schema
+from src.basic_strategy.card_eval import card_eval_batch
+from src.basic_strategy.mode_selector import MODE_SHOES
+
+USERS = [f"user{i}" for i in range(10)]
+MODES = ["basic", "soft", "hard", "split", "count"]
+RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
+MOVES = ["s", "h", "d", "ds", "spl", "sur", "das"]
+
+
+def seed_all(seed: int) -> None:
+    """Seed every random number generator used by the trainer.
+
+    Args:
+        seed (int): random seed
+    """
+    random.seed(seed)
+    for offset, shoe in enumerate(MODE_SHOES.values()):
+        shoe.rng.seed(seed + offset)
+
+
+def measure(
+    name: str, func: Callable[[], object], number: int = 1, repeat: int = 5, size: Optional[int] = None
+) -> dict:
+    """Time a function.
+
+    Args:
+        name (str): benchmark name
+        func (Callable[[], object]): function to time
+        number (int, optional): calls per timing run. Defaults to 1.
+        repeat (int, optional): timing runs. Defaults to 5.
+        size (Optional[int], optional): table size the benchmark ran on. Defaults to None.
+
+    Returns:
+        dict: benchmark name, size and seconds per call (min, median, mean)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    median = statistics.median(timings)
+    result = {
+        "name": name,
+        "size": size,
+        "number": number,
+        "repeat": repeat,
+        "min_s": min(timings),
+        "median_s": median,
+        "mean_s": statistics.fmean(timings),
+    }
+    print(f"{name:<32} {'' if size is None else f'{size:>9,}'} {median * 1e6:>14,.1f} us")
+    return result
+
+
+def import_time(module: str, repeat: int = 3, top: int = 10) -> dict:
+    """Measure the import time of a module in new interpreters with python -X importtime.
+
+    Args:
+        module (str): module to import
+        repeat (int, optional): interpreters started. Defaults to 3.
+        top (int, optional): number of slowest imported modules to report. Defaults to 10.
+
+    Returns:
+        dict: benchmark result with the cumulative import time and the slowest imports by own time
+    """
+    name = f"import {module}"
+    timings, own_times = [], {}
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True
+        )
+        if process.returncode:
+            print(f"{name:<42} failed: {process.stderr.strip().splitlines()[-1]}")
+            return {"name": name, "size": None, "error": process.stderr.strip().splitlines()[-1]}
+        lines = [line[len("import time:") :].split("|") for line in process.stderr.splitlines()]  # noqa: E203
+        times = {parts[2].strip(): (int(parts[0]), int(parts[1])) for parts in lines[1:] if len(parts) == 3}
+        timings.append(times[module][1] / 1e6)
+        own_times = {imported: own / 1e6 for imported, (own, _) in times.items()}
+    median = statistics.median(timings)
+    print(f"{name:<42} {median * 1e6:>14,.1f} us")
+    return {
+        "name": name,
+        "size": None,
+        "number": 1,
+        "repeat": repeat,
+        "min_s": min(timings),
+        "median_s": median,
+        "mean_s": statistics.fmean(timings),
+        "slowest_imports": dict(sorted(own_times.items(), key=lambda item: -item[1])[:top]),
+    }
+
+
+def training_data(
+    rows: int, seed: int, users: Optional[list[str]] = None, modes: Optional[list[str]] = None
+) -> pd.DataFrame:
+    """Create random rows for the training_data table.
+
+    Args:
+        rows (int): number of rows
+        seed (int): random seed
+        users (Optional[list[str]], optional): user names, USERS if None. Defaults to None.
+        modes (Optional[list[str]], optional): training modes, MODES if None. Defaults to None.
+
+    Returns:
+        pd.DataFrame: training data spread over the last year
+    """
+    rng = np.random.default_rng(seed)
+    card1, card2 = rng.choice(RANKS, size=(2, rows))
+    dealer_card = rng.integers(2, 12, size=rows)
+    correct = card_eval_batch(card1, card2, dealer_card)
+    guessed = np.where(rng.random(rows) < 0.8, correct, rng.choice(MOVES, size=rows))
+    values = {rank: min(int(rank), 10) if rank.isdigit() else (11 if rank == "A" else 10) for rank in RANKS}
+    hand_value = np.vectorize(values.get)(card1) + np.vectorize(values.get)(card2)
+    now = np.datetime64(datetime.datetime.now(), "s")
+    upload_time = now - rng.integers(0, 365 * 24 * 3600, size=rows).astype("timedelta64[s]")
+    dataframe = pd.DataFrame(
+        {
+            "user": rng.choice(users or USERS, size=rows),
+            "training_type": rng.choice(modes or MODES, size=rows),
+            "was_correct": guessed == correct,
+            "correct_move": correct,
+            "guessed_move": guessed,
+            "card1": card1,
+            "card2": card2,
+            "hand_value": np.where(hand_value == 22, 12, hand_value),
+            "dealer_card": dealer_card,
+            "upload_time": np.sort(upload_time),
+        }
+    )
+    return dataframe.astype(TABLE_DTYPES)
+
+
+def database(path: pathlib.Path, rows: int, seed: int) -> sa.engine.Engine:
+    """Create a sqlite database filled with random training data.
+
+    Args:
+        path (pathlib.Path): database file, replaced if it exists
+        rows (int): number of rows
+        seed (int): random seed
+
+    Returns:
+        sa.engine.Engine: engine of the new database
+    """
+    path.unlink(missing_ok=True)
+    engine = sa.create_engine(f"sqlite:///{path}")
+    ensure_schema(engine)
+    with engine.begin() as conn:
+        training_data(rows, seed).to_sql("training_data", conn, if_exists="append", index=False, chunksize=50_000)
+    return engine
+
+
+def metadata(seed: int) -> dict:
+    """Describe the environment a benchmark ran in.
+
+    Args:
+        seed (int): random seed
+
+    Returns:
+        dict: time, git commit, python version, platform and seed
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+    }
+
+
+def save_results(path: pathlib.Path, meta: dict, results: list[dict]) -> None:
+    """Write benchmark results to a json file.
+
+    Args:
+        path (pathlib.Path): output file
+        meta (dict): environment description
+        results (list[dict]): benchmark results
+    """
+    path.write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+
+
+def compare_results(path: pathlib.Path, results: list[dict]) -> None:
+    """Print the change of every benchmark against an earlier result file.
+
+    Args:
+        path (pathlib.Path): earlier result file
+        results (list[dict]): current benchmark results
+    """
+    baseline = {(result["name"], result["size"]): result for result in json.loads(path.read_text())["results"]}
+    for result in results:
+        old = baseline.get((result["name"], result["size"]))
+        if old and "median_s" in old and "median_s" in result:
+            ratio = result["median_s"] / old["median_s"]
+            size = "" if result["size"] is None else f"{result['size']:>9,}"
+            print(f"{result['name']:<32} {size} {ratio:>8.2f}x {'slower' if ratio > 1 else 'faster'}")
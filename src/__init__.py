@@ -1,26 +1,63 @@
-"""This module initializes the database and contains the other submodules."""
-
-import pathlib
-
-import pandas as pd
-import sqlalchemy as sa
-
-db_file = pathlib.Path.cwd() / "db" / "db.sqlite"
-if not db_file.exists():
-    db_file.touch()
-engine = sa.create_engine("sqlite:///db/db.sqlite")
-
-TABLE_DTYPES = {
-    "user": pd.StringDtype(),
-    "training_type": pd.StringDtype(),
-    "was_correct": pd.BooleanDtype(),
-    "correct_move": pd.StringDtype(),
-    "guessed_move": pd.StringDtype(),
-    "card1": pd.StringDtype(),
-    "card2": pd.StringDtype(),
-    "hand_value": pd.Int16Dtype(),
-    "dealer_card": pd.Int16Dtype(),
-    "upload_time": "datetime64[ns]",
+"""This module contains the submodules and gives lazy access to the database.
+
+The database objects are defined in src.storage.database, which is only imported when one of them is first used.
+Importing the strategy modules therefore neither loads pandas and sqlalchemy nor creates the database engine.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import sqlalchemy as sa
+
+    from src.storage.database import (  # noqa: F401
+        ANSWER_BACKEND,
+        DB_URL,
+        EXT_TABLE_DTYPES,
+        TABLE_DTYPES,
+        create_engine,
+        ensure_schema,
+        metadata,
+        rebuild_rollup,
+        training_daily_rollup,
+        training_data,
+        training_distinct_values,
+    )
+
+    engine: sa.engine.Engine
+
+DATABASE_ATTRIBUTES = {
+    "ANSWER_BACKEND",
+    "DB_URL",
+    "EXT_TABLE_DTYPES",
+    "TABLE_DTYPES",
+    "create_engine",
+    "ensure_schema",
+    "metadata",
+    "rebuild_rollup",
+    "training_daily_rollup",
+    "training_data",
+    "training_distinct_values",
 }
 
-EXT_TABLE_DTYPES = {**TABLE_DTYPES, "date": "datetime64[ns]", "count": pd.Int32Dtype(), "total": pd.Int32Dtype()}
+
+def __getattr__(name: str) -> Any:
+    """Import the database objects on first access.
+
+    Args:
+        name (str): attribute name
+
+    Raises:
+        AttributeError: unknown attribute
+
+    Returns:
+        Any: database object, engine is the shared engine of the configured database
+    """
+    if name == "engine":
+        value = importlib.import_module("src.storage.database").default_engine()
+    elif name in DATABASE_ATTRIBUTES:
+        value = getattr(importlib.import_module("src.storage.database"), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
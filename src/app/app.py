@@ -4,13 +4,22 @@ import dash
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 
+from src import engine
+from src.app.metrics import metrics_response
+from src.basic_strategy.strategy_gen import warm_strategy_tables
+from src.tools.compact import schedule_compaction
+
 from . import game_callbacks, ui_callbacks  # noqa: F401
 
+warm_strategy_tables()
+schedule_compaction(engine)
+
 app = dash.Dash(
     __name__,
     use_pages=True,
     external_stylesheets=[dbc.themes.MATERIA, "assets/style.css"],
 )
+app.server.add_url_rule("/metrics", "metrics", metrics_response)
 nav_link_style = {
     "margin": "1em 1em",
     "text-align": "center",
@@ -58,6 +67,7 @@ app.layout = dbc.Container(
         dcc.Interval(id="10_min", interval=1000 * 10 * 60),
         dcc.Store("data_store", storage_type="session"),
         dcc.Store("cards_store", storage_type="session"),
+        dcc.Store("rules_store", storage_type="session"),
     ],
     className="dbc",
     fluid=True,
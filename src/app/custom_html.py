@@ -21,10 +21,10 @@ def html_hand(hand: Hand, player: int) -> html.Span:
     web_hand = html.Span(
         [
             html.Span(
-                card.unicode,
-                className=COLOUR_DICT[card.suit] if card.face_up else "blue",  # type:ignore[attr-defined]
+                card.display_card(face_up),
+                className=COLOUR_DICT[card.suit] if face_up else "blue",  # type:ignore[attr-defined]
             )
-            for card in hand.cards
+            for card, face_up in zip(hand.cards, hand.face_up)
         ],
         className=f"hand {CSS_CLASS_DICT[player]}",
     )
@@ -1,17 +1,24 @@
 """This script contains the callbacks used in the app gameplay loop."""
 
-import datetime
+import contextlib
+from typing import Optional
 
 import pandas as pd
 from dash import Input, Output, State, callback, ctx, html
 
-from src import TABLE_DTYPES, engine
+from src.app.metrics import instrument
 from src.basic_strategy.card_eval import card_eval
+from src.basic_strategy.counting import HI_LO, count_eval, true_count
 from src.basic_strategy.hand import Hand
-from src.basic_strategy.mode_selector import deal_solo_cards
+from src.basic_strategy.mode_selector import CountingShoe, deal_solo_cards
+from src.basic_strategy.rules import Rules
+from src.basic_strategy.strategy_gen import strategy_table
+from src.storage.buffer import ANSWER_BUFFER, answer_record
 
 from .custom_html import html_hand
 
+COUNT_SHOES: dict[str, CountingShoe] = {}
+
 
 @callback(
     Output("bj-table", "children"),
@@ -22,9 +29,13 @@ from .custom_html import html_hand
     State("user_input", "value"),
     prevent_initial_callback=True,
 )
+@instrument
 def deal_and_save_cards(n_clicks: int, mode: str, data: list, username: str) -> tuple[list, list]:
     """Deal cards and saves them in a store object.
 
+    In count mode every user deals from an own persistent shoe, the running count visible to the player
+    and the number of unseen cards are stored with the cards.
+
     Args:
         n_clicks (int): click number of the deal button
         mode (str): training mode (what deck is used?)
@@ -36,23 +47,27 @@ def deal_and_save_cards(n_clicks: int, mode: str, data: list, username: str) ->
     """
     if username:
         if n_clicks:
-            cards = deal_solo_cards(mode)
-            cards[3].turn_card()
+            shoe = COUNT_SHOES.setdefault(username, CountingShoe()) if mode == "count" else None
+            with shoe.lock if shoe is not None else contextlib.nullcontext():
+                cards = deal_solo_cards(mode, shoe)
+                count_data = (shoe.running_count - HI_LO[cards[3].code], shoe.cards_left + 1) if shoe else None
             player_hand = Hand(cards[0:2])
-            dealer_hand = Hand(cards[2:4])
+            dealer_hand = Hand(cards[2:4], [True, False])
             card_df = pd.DataFrame(
                 {
                     "owner": pd.Series([0, 1], dtype=pd.Int16Dtype()),
                     "hands": pd.Series([dealer_hand.card_str, player_hand.card_str], dtype=pd.StringDtype()),
                     "face_up": pd.Series(
                         [
-                            "".join([str(int(card.face_up)) for card in dealer_hand.cards]),
+                            "".join([str(int(up)) for up in dealer_hand.face_up]),
                             "1" * len(player_hand.cards),
                         ],
                         dtype=pd.StringDtype(),
                     ),
                 }
             )
+            if count_data is not None:
+                card_df["running_count"], card_df["cards_left"] = count_data
             return [html_hand(dealer_hand, 0), html_hand(player_hand, 1)], card_df.to_dict("records")
         if data:
             card_df = pd.DataFrame(data)
@@ -101,13 +116,17 @@ COLOR_DICT = {
         "data": State("cards_store", "data"),
         "user": State("user_input", "value"),
         "mode": State("gamemode_dd", "value"),
+        "rules": State("rules_store", "data"),
     },
     prevent_initial_callback=True,
 )
-def eval_action(_: list, n_clicks: int, data: list, user: str, mode: str) -> list[html.Button]:
+@instrument
+def eval_action(
+    _: list, n_clicks: int, data: list, user: str, mode: str, rules: Optional[dict] = None
+) -> list[html.Button]:
     """Evaluate a chosen action against the basic strategy and display correct choice.
 
-    Also writes choices to database.
+    Also queues the choice to be written to the database.
 
     Args:
         _ (list): buttons of basic strategy choices
@@ -115,6 +134,7 @@ def eval_action(_: list, n_clicks: int, data: list, user: str, mode: str) -> lis
         data (list): current card data
         user (str): current user
         mode (str): selected training mode (affects evaluation)
+        rules (Optional[dict], optional): house rules selected on the settings page. Defaults to None.
 
     Returns:
         list[html.Button]: correct choice
@@ -127,23 +147,13 @@ def eval_action(_: list, n_clicks: int, data: list, user: str, mode: str) -> lis
         chosen_action = ctx.triggered_id
         dataframe = pd.DataFrame(data)
         dealer, player = [Hand.from_string(row.hands, row.face_up) for _, row in dataframe.iterrows()]
-        correct_action = card_eval(player, dealer.cards[0], "basic")
-        df = pd.DataFrame(
-            {
-                "user": pd.Series([user], dtype=pd.StringDtype()),
-                "training_type": pd.Series([mode], dtype=pd.StringDtype()),
-                "was_correct": pd.Series([chosen_action == correct_action], dtype=pd.BooleanDtype()),
-                "correct_move": pd.Series([correct_action], dtype=pd.StringDtype()),
-                "guessed_move": pd.Series([chosen_action], dtype=pd.StringDtype()),
-                "card1": pd.Series([player.cards[0].rank], dtype=pd.StringDtype()),
-                "card2": pd.Series([player.cards[1].rank], dtype=pd.StringDtype()),
-                "hand_value": pd.Series([player.value], dtype=pd.Int32Dtype()),
-                "dealer_card": pd.Series([dealer.cards[1].value], dtype=pd.Int32Dtype()),
-                "upload_time": pd.Series([datetime.datetime.now()], dtype="datetime64[ns]"),
-            },
-        ).astype(TABLE_DTYPES)
-        with engine.begin() as conn:
-            df.to_sql("training_data", conn, if_exists="append", index=False)
+        table = strategy_table(Rules(**rules)) if rules else None
+        if mode == "count" and "running_count" in dataframe:
+            count = true_count(dataframe.running_count[0], dataframe.cards_left[0])
+            correct_action = count_eval(player, dealer.cards[0], "basic", count, table)
+        else:
+            correct_action = card_eval(player, dealer.cards[0], "basic", table)
+        ANSWER_BUFFER.add(answer_record(user, mode, chosen_action, correct_action, player, dealer.cards[0]))
         return [
             html.Button(
                 [MOVE_DICT[correct_action]],
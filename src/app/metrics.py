@@ -0,0 +1,212 @@
+"""This script contains latency histograms of the dash callbacks and their export in the Prometheus text format.
+
+Every instrumented callback records its wall time and the time its thread spent in database queries. The json size
+of its arguments and of its result is only measured on every PAYLOAD_SAMPLE_EVERY-th call, because serializing
+large figures costs about as much as building them. Writes of the answer buffer run in its own thread and are not
+counted.
+"""
+
+import bisect
+import functools
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable, TypeVar
+
+import flask
+import sqlalchemy as sa
+from plotly.io.json import to_json_plotly
+
+from src.stats.figure_cache import FIGURE_CACHE
+
+F = TypeVar("F", bound=Callable[..., Any])
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(float(256 * 4**i) for i in range(9))
+CALLBACK_METRICS = {
+    "blackjack_callback_seconds": ("Wall time of the dash callbacks.", SECONDS_BUCKETS),
+    "blackjack_callback_db_seconds": ("Time the dash callbacks spent in database queries.", SECONDS_BUCKETS),
+    "blackjack_callback_request_bytes": ("Json size of the callback arguments of sampled calls.", BYTES_BUCKETS),
+    "blackjack_callback_response_bytes": ("Json size of the callback results of sampled calls.", BYTES_BUCKETS),
+}
+PAYLOAD_SAMPLE_EVERY = max(int(os.environ.get("BLACKJACK_PAYLOAD_SAMPLE_EVERY", "10")), 1)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds like a Prometheus histogram."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+            buckets (tuple[float, ...]): sorted upper bounds, the +Inf bucket is added
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Count a value in its bucket.
+
+        Args:
+            value (float): observed value
+        """
+        with self.lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        """Format the cumulative buckets, sum and count as sample lines.
+
+        Args:
+            name (str): metric name
+            labels (str): label pairs without braces
+
+        Returns:
+            list[str]: sample lines
+        """
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {total}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class CallbackMetrics:
+    """Histograms of the instrumented callbacks, created on the first call of a callback."""
+
+    def __init__(self) -> None:
+        """Initialize without histograms."""
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, metric: str, callback: str, value: float) -> None:
+        """Record a value of a callback.
+
+        Args:
+            metric (str): name from CALLBACK_METRICS
+            callback (str): callback name
+            value (float): observed value
+        """
+        key = (metric, callback)
+        if key not in self.histograms:
+            with self.lock:
+                self.histograms.setdefault(key, Histogram(CALLBACK_METRICS[metric][1]))
+        self.histograms[key].observe(value)
+
+    def render(self) -> str:
+        """Format all histograms and the figure cache counters in the Prometheus text format.
+
+        Returns:
+            str: exposition text
+        """
+        lines = []
+        for metric, (help_text, _) in CALLBACK_METRICS.items():
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for (name, callback), histogram in sorted(self.histograms.items()):
+                if name == metric:
+                    lines += histogram.lines(metric, f'callback="{callback}"')
+        stats = FIGURE_CACHE.stats()
+        for name in ("hits", "misses", "evictions"):
+            metric = f"blackjack_figure_cache_{name}_total"
+            lines += [f"# HELP {metric} Figure cache {name}.", f"# TYPE {metric} counter", f"{metric} {stats[name]}"]
+        for name in ("entries", "bytes"):
+            metric = f"blackjack_figure_cache_{name}"
+            lines += [f"# HELP {metric} Figure cache {name}.", f"# TYPE {metric} gauge", f"{metric} {stats[name]}"]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = CallbackMetrics()
+QUERY_TIME = threading.local()
+
+
+@sa.event.listens_for(sa.engine.Engine, "before_cursor_execute")
+def start_query(conn: sa.Connection, *_: Any) -> None:
+    """Remember the start of a query.
+
+    Args:
+        conn (sa.Connection): connection executing the query
+    """
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@sa.event.listens_for(sa.engine.Engine, "after_cursor_execute")
+def end_query(conn: sa.Connection, *_: Any) -> None:
+    """Add the duration of a query to the callback running in this thread.
+
+    Args:
+        conn (sa.Connection): connection executing the query
+    """
+    starts = conn.info.get("query_start")
+    if starts:
+        elapsed = time.perf_counter() - starts.pop()
+        if getattr(QUERY_TIME, "seconds", None) is not None:
+            QUERY_TIME.seconds += elapsed
+
+
+def payload_size(values: Iterable) -> int:
+    """Measure values by the size of their json like dash sends them.
+
+    Args:
+        values (Iterable): callback arguments or results
+
+    Returns:
+        int: size in bytes
+    """
+    return len(to_json_plotly(list(values)).encode())
+
+
+def instrument(func: F) -> F:
+    """Record the wall time and database time of every call of a callback and the payload sizes of sampled calls.
+
+    The first and then every PAYLOAD_SAMPLE_EVERY-th call is sampled. The payloads are serialized outside of the
+    timed section. Database engines passed as default arguments are not part of the payload. A failing call is
+    recorded without a response size.
+
+    Args:
+        func (F): callback function
+
+    Returns:
+        F: instrumented callback
+    """
+    calls = itertools.count()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        sampled = next(calls) % PAYLOAD_SAMPLE_EVERY == 0
+        if sampled:
+            values = [value for value in [*args, *kwargs.values()] if not isinstance(value, sa.engine.Engine)]
+            METRICS.observe("blackjack_callback_request_bytes", func.__name__, payload_size(values))
+        outer, QUERY_TIME.seconds = getattr(QUERY_TIME, "seconds", None), 0.0
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            METRICS.observe("blackjack_callback_seconds", func.__name__, time.perf_counter() - start)
+            METRICS.observe("blackjack_callback_db_seconds", func.__name__, QUERY_TIME.seconds)
+            QUERY_TIME.seconds = None if outer is None else outer + QUERY_TIME.seconds
+        if sampled:
+            METRICS.observe(
+                "blackjack_callback_response_bytes",
+                func.__name__,
+                payload_size(result if isinstance(result, tuple) else [result]),
+            )
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+def metrics_response() -> flask.Response:
+    """Serve the metrics of the app.
+
+    Returns:
+        flask.Response: Prometheus exposition text
+    """
+    return flask.Response(METRICS.render(), content_type=CONTENT_TYPE)
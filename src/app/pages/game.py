@@ -15,7 +15,7 @@ dash.register_page(
 )
 
 gamemode_dd = dcc.Dropdown(
-    ["basic", "hard", "soft", "split"],
+    ["basic", "hard", "soft", "split", "count"],
     "basic",
     clearable=False,
     id="gamemode_dd",
@@ -1,6 +1,11 @@
 """This script defines the page layout for the /settings page."""
 
 import dash
+import dash_bootstrap_components as dbc
+import dash_mantine_components as dmc
+from dash import dcc, html
+
+from src.basic_strategy.rules import Rules
 
 dash.register_page(
     __name__,
@@ -9,4 +14,53 @@ dash.register_page(
     title="Blackjack Trainer Settings",
     description="Settings page.",
 )
-layout: list = []
+DEFAULT_RULES = Rules()
+
+
+def rule_switch(label: str, switch_id: str, checked: bool) -> dmc.Switch:
+    """Create a switch for a boolean house rule.
+
+    Args:
+        label (str): switch label
+        switch_id (str): component id
+        checked (bool): default state
+
+    Returns:
+        dmc.Switch: rule switch
+    """
+    return dmc.Switch(
+        label,
+        id=switch_id,
+        checked=checked,
+        size="md",
+        radius="xl",
+        color="ff0000",
+        persistence=True,
+        persistence_type="session",
+    )
+
+
+decks_dd = dcc.Dropdown(
+    [1, 2, 4, 6, 8],
+    DEFAULT_RULES.decks,
+    clearable=False,
+    id="decks_dd",
+    persistence=True,
+    persistence_type="session",
+)
+h17_switch = rule_switch("dealer hits soft 17", "h17_switch", DEFAULT_RULES.hit_soft_17)
+das_switch = rule_switch("double after split", "das_switch", DEFAULT_RULES.double_after_split)
+surrender_switch = rule_switch("late surrender", "surrender_switch", DEFAULT_RULES.late_surrender)
+resplit_aces_switch = rule_switch("resplit aces", "resplit_aces_switch", DEFAULT_RULES.resplit_aces)
+layout: list = [
+    dbc.Row(
+        [
+            dbc.Col([html.Label("decks"), decks_dd], width=2),
+            dbc.Col(h17_switch),
+            dbc.Col(das_switch),
+            dbc.Col(surrender_switch),
+            dbc.Col(resplit_aces_switch),
+        ]
+    ),
+    dbc.Row(html.Div(id="rules_status")),
+]
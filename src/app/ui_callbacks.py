@@ -1,41 +1,46 @@
 """This script contains the callbacks used in the app ui generation."""
 
+import dataclasses
+from typing import Optional
+
 import dash_bootstrap_components as dbc
-import pandas as pd
 import sqlalchemy as sa
-from dash import Input, Output, callback, dcc, html
+from dash import Input, Output, State, callback, dcc, html, no_update
 
-from src import EXT_TABLE_DTYPES, TABLE_DTYPES, engine
+from src import engine, ensure_schema, training_distinct_values
+from src.app.metrics import instrument
+from src.basic_strategy.rules import Rules
+from src.basic_strategy.strategy_gen import strategy_table
 from src.stats.create_plots import main_plot
+from src.stats.dataset import dataset_version
+from src.stats.figure_cache import FIGURE_CACHE
+from src.storage.columnar import AnswerLog, answer_store
+
 
+@callback(Output("data_store", "data"), Input("1_min", "n_intervals"), State("data_store", "data"))
+@instrument
+def load_data(_: int, version: Optional[str] = None, engine: sa.engine.Engine = engine) -> str:
+    """Check the training data for changes, runs every 1 minute.
 
-@callback(Output("data_store", "data"), Input("1_min", "n_intervals"))
-def load_data(_: int, engine: sa.engine.Engine = engine) -> list:
-    """Load data from the database every 1 minute.
+    Only a version token is sent to the browser. The dashboard callbacks read their data from the database when
+    the token changes.
 
     Args:
         _ (int): trigger to execute function
+        version (Optional[str], optional): dataset version in the data_store. Defaults to None.
         engine (sa.engine.Engine, optional): Optional database engine. Defaults to engine.
 
     Returns:
-        list: data read from database
+        str: dataset version, no update if the data did not change
     """
-    table = sa.Table("training_data", sa.MetaData(), autoload_with=engine)
-    stmt = sa.select(table)
-    with engine.begin() as conn:
-        dataframe = pd.read_sql(
-            stmt,
-            conn,
-            index_col="index",
-            dtype=TABLE_DTYPES,
-        )
-    dataframe["date"] = dataframe["upload_time"].dt.date
-    dataframe["count"] = 1
-    dataframe["total"] = 1
-    return dataframe.to_dict("records")
+    current = dataset_version(answer_store(engine))
+    if current is None or current == version:
+        return no_update
+    return current
 
 
 @callback(Output("user_dd", "disabled"), Input("user_switch", "checked"))
+@instrument
 def activate_user_dropdown(switch: bool) -> bool:
     """Switch the user dropdown on and off.
 
@@ -49,6 +54,7 @@ def activate_user_dropdown(switch: bool) -> bool:
 
 
 @callback(Output("mode_dd", "disabled"), Input("mode_switch", "checked"))
+@instrument
 def activate_mode_dropdown(switch: bool) -> bool:
     """Switch the mode dropdown on and off.
 
@@ -62,6 +68,7 @@ def activate_mode_dropdown(switch: bool) -> bool:
 
 
 @callback(Output("move_dd", "disabled"), Input("move_switch", "checked"))
+@instrument
 def activate_move_dropdown(switch: bool) -> bool:
     """Switch the move dropdown on and off.
 
@@ -85,8 +92,9 @@ def activate_move_dropdown(switch: bool) -> bool:
     Input("move_dd", "value"),
     Input("abs_val_dd", "value"),
 )
+@instrument
 def plot_data_callback(
-    data: list,
+    data: str,
     split_user: bool,
     split_mode: bool,
     split_move: bool,
@@ -94,11 +102,14 @@ def plot_data_callback(
     mode_dd: list,
     move_dd: list,
     abs_val: str,
+    engine: sa.engine.Engine = engine,
 ) -> list:
-    """Plot the aggregated move data over different days.
+    """Plot the aggregated move data over different days, the data is aggregated in the database.
+
+    The figures are cached by dataset version and settings, an unchanged view is not built again.
 
     Args:
-        data (list): blackjack move data
+        data (str): dataset version, triggers the update
         split_user (bool): split into different graphs per user?
         split_mode (bool): split into different graphs per mode?
         split_move (bool): split into different bars per move?
@@ -106,6 +117,7 @@ def plot_data_callback(
         mode_dd (list): selected modes
         move_dd (list): selected moves
         abs_val (str): show absolute values or percentages
+        engine (sa.engine.Engine, optional): Optional database engine. Defaults to engine.
 
     Returns:
         list: list of all graphs
@@ -117,7 +129,9 @@ def plot_data_callback(
             mode_dd = []
         if not split_move:
             move_dd = []
-        fig_dict = main_plot(data, user_dd, mode_dd, move_dd, abs_val == "absolute values")
+        absolute = abs_val == "absolute values"
+        key = (engine, data, tuple(user_dd or []), tuple(mode_dd or []), tuple(move_dd or []), absolute)
+        fig_dict = FIGURE_CACHE.get(key, lambda: main_plot(None, user_dd, mode_dd, move_dd, absolute, engine))
         graphs = [
             [dbc.Row(html.H1(f"{user} {mode}")), dbc.Row([dbc.Col(dcc.Graph(figure=graph))])]
             for user, d in fig_dict.items()
@@ -127,37 +141,83 @@ def plot_data_callback(
     return []
 
 
-@callback(Output("user_dd", "options"), Input("data_store", "data"), prevent_initial_callback=True)
-def populate_user_dropdown(data: list) -> list:
-    """Set available options for user dropdown.
+def distinct_values(engine: sa.engine.Engine) -> dict[str, list]:
+    """Read the distinct users and training types in one query of the distinct values index.
+
+    The answer log reads them from its dictionary.
 
     Args:
-        data (list): blackjack move data
+        engine (sa.engine.Engine): database engine
 
     Returns:
-        list: available user
+        dict[str, list]: sorted values of the user and training_type columns
     """
-    if data:
-        dataframe = pd.DataFrame(data).astype(EXT_TABLE_DTYPES)
-        return dataframe.user.unique().tolist()
-    return []
+    store = answer_store(engine)
+    if isinstance(store, AnswerLog):
+        return {column: sorted(store.dictionary[column]) for column in ("user", "training_type")}
+    ensure_schema(engine)
+    values: dict[str, list] = {"user": [], "training_type": []}
+    stmt = sa.select(training_distinct_values.c.field, training_distinct_values.c.value).order_by(
+        training_distinct_values.c.field, training_distinct_values.c.value
+    )
+    with engine.begin() as conn:
+        for field, value in conn.execute(stmt):
+            values[field].append(value)
+    return values
 
 
 @callback(
+    Output("user_dd", "options"),
     Output("mode_dd", "options"),
     Input("data_store", "data"),
     prevent_initial_callback=True,
 )
-def populate_mode_dropdown(data: list):
-    """Set available options for mode dropdown.
+@instrument
+def populate_dropdowns(data: str, engine: sa.engine.Engine = engine) -> tuple[list, list]:
+    """Set available options for the user and mode dropdowns from the distinct values index.
 
     Args:
-        data (list): blackjack move data
+        data (str): dataset version, triggers the update
+        engine (sa.engine.Engine, optional): Optional database engine. Defaults to engine.
 
     Returns:
-        list: available modes
+        tuple[list, list]: available users, available modes
     """
     if data:
-        dataframe = pd.DataFrame(data).astype(EXT_TABLE_DTYPES)
-        return dataframe.training_type.unique().tolist()
-    return []
+        values = distinct_values(engine)
+        return values["user"], values["training_type"]
+    return [], []
+
+
+@callback(
+    Output("rules_store", "data"),
+    Output("rules_status", "children"),
+    Input("decks_dd", "value"),
+    Input("h17_switch", "checked"),
+    Input("das_switch", "checked"),
+    Input("surrender_switch", "checked"),
+    Input("resplit_aces_switch", "checked"),
+)
+@instrument
+def save_rules(decks: int, hit_soft_17: bool, das: bool, surrender: bool, resplit_aces: bool) -> tuple[dict, str]:
+    """Save the selected house rules and load their strategy table.
+
+    Args:
+        decks (int): number of decks
+        hit_soft_17 (bool): does the dealer hit soft 17?
+        das (bool): is doubling after a split allowed?
+        surrender (bool): is late surrender allowed?
+        resplit_aces (bool): can aces be resplit?
+
+    Returns:
+        tuple[dict, str]: selected rules, status message
+    """
+    rules = Rules(
+        decks=decks,
+        hit_soft_17=bool(hit_soft_17),
+        double_after_split=bool(das),
+        late_surrender=bool(surrender),
+        resplit_aces=bool(resplit_aces),
+    )
+    strategy_table(rules)
+    return dataclasses.asdict(rules), f"Strategy table {rules.key} is loaded."
@@ -1,19 +1,16 @@
 """This contains the training gameplay loop for the command line."""
 
-import datetime
-
-import pandas as pd
-
-from src import TABLE_DTYPES, engine
 from src.basic_strategy.card_eval import card_eval
+from src.basic_strategy.counting import HI_LO, count_eval, true_count
 from src.basic_strategy.hand import Hand
-from src.basic_strategy.mode_selector import deal_solo_cards
+from src.basic_strategy.mode_selector import COUNT_SHOE, deal_solo_cards
+from src.storage.buffer import ANSWER_BUFFER, answer_record
 
 ENDC = "\033[0m"
 OKGREEN = "\033[92m"
 FAIL = "\033[91m"
 if __name__ == "__main__":
-    mode = input("Select your mode: ('split','soft','hard')(leave empty for basic)\n")
+    mode = input("Select your mode: ('split','soft','hard','count')(leave empty for basic)\n")
     mode = mode or "basic"
     user = input("Input your username:\n")
     while True:
@@ -21,24 +18,13 @@ if __name__ == "__main__":
         hand, dealer = Hand(dealt_cards[0:2]), dealt_cards[2]
         print(f"Your hand: '{",".join([str(c) for c in hand.cards])}' | Dealer upcard: {dealer}")
         choice = input("Your choice: ")
-        correct = card_eval(hand, dealer, mode)
+        if mode == "count":
+            running_count = COUNT_SHOE.running_count - HI_LO[dealt_cards[3].code]
+            correct = count_eval(hand, dealer, mode, true_count(running_count, COUNT_SHOE.cards_left + 1))
+        else:
+            correct = card_eval(hand, dealer, mode)
         if choice == correct:
             print(f"{OKGREEN}success{ENDC}")
         else:
             print(f"{FAIL}{correct}{ENDC}")
-        df = pd.DataFrame(
-            {
-                "user": pd.Series([user], dtype=pd.StringDtype()),
-                "training_type": pd.Series([mode], dtype=pd.StringDtype()),
-                "was_correct": pd.Series([choice == correct], dtype=pd.BooleanDtype()),
-                "correct_move": pd.Series([correct], dtype=pd.StringDtype()),
-                "guessed_move": pd.Series([choice], dtype=pd.StringDtype()),
-                "card1": pd.Series([hand.cards[0].rank], dtype=pd.StringDtype()),
-                "card2": pd.Series([hand.cards[1].rank], dtype=pd.StringDtype()),
-                "hand_value": pd.Series([hand.value], dtype=pd.Int32Dtype()),
-                "dealer_card": pd.Series([dealer.value], dtype=pd.Int32Dtype()),
-                "upload_time": pd.Series([datetime.datetime.now()], dtype="datetime64[ns]"),
-            }
-        ).astype(TABLE_DTYPES)
-        with engine.begin() as conn:
-            df.to_sql("training_data", conn, if_exists="append", index=False)
+        ANSWER_BUFFER.add(answer_record(user, mode, choice, correct, hand, dealer))
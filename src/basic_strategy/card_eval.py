@@ -1,8 +1,18 @@
 """This script contains functions to evaluate a blackjack hand."""
 
-from typing import Optional
+import functools
+import itertools
+from typing import TYPE_CHECKING, Optional
 
-from src.basic_strategy.hand import Card, Hand
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+
+from src.basic_strategy.hand import CARD_VALS, Card, Hand
+
+PAIR, SOFT, HARD = 0, 1, 2
+NO_SPLIT_MODES = ["soft", "hard"]
+MOVES = ["", "s", "h", "d", "ds", "spl", "das", "sur"]
 
 
 def can_surrender(hand: Hand, dealer: Card) -> bool:
@@ -99,8 +109,8 @@ def should_double(hand: Hand, dealer: Card) -> str:
     return "o"
 
 
-def card_eval(hand: Hand, dealer: Card, mode: str) -> str:
-    """Completely evaluate a blackjack hand using basic strategy.
+def rule_eval(hand: Hand, dealer: Card, mode: str) -> str:
+    """Evaluate a blackjack hand by walking the basic strategy rules.
 
     Args:
         hand (Hand): player hand
@@ -112,7 +122,137 @@ def card_eval(hand: Hand, dealer: Card, mode: str) -> str:
     """
     if can_surrender(hand, dealer):
         return "sur"
-    if mode not in ["soft", "hard"]:
+    if mode not in NO_SPLIT_MODES:
         if s := should_split(hand, dealer):
             return s
     return should_double(hand, dealer)
+
+
+def hand_key(hand: Hand) -> tuple[int, int]:
+    """Classify a two card hand for the strategy table.
+
+    Pairs are keyed by the value of the paired card, soft and hard hands by their hand value.
+
+    Args:
+        hand (Hand): two card player hand
+
+    Returns:
+        tuple[int, int]: hand class (PAIR, SOFT or HARD), table row
+    """
+    first, second = hand.cards
+    if first.value == second.value:
+        return PAIR, first.value
+    if first.value == 11 or second.value == 11:
+        return SOFT, hand.value
+    return HARD, hand.value
+
+
+def build_strategy_table() -> list:
+    """Build the strategy table from the basic strategy rules.
+
+    The table is indexed by [hand class][hand value or pair value][dealer value][split not allowed].
+
+    Returns:
+        list: nested strategy table, unreachable entries are None
+    """
+    table: list = [[[[None, None] for _ in range(12)] for _ in range(22)] for _ in range(3)]
+    ranks = {value: rank for rank, value in CARD_VALS.items()}
+    for value1, value2, dealer_value in itertools.product(ranks, repeat=3):
+        hand = Hand([Card("s", ranks[value1]), Card("h", ranks[value2])])
+        dealer = Card("d", ranks[dealer_value])
+        hand_class, row = hand_key(hand)
+        for mode in ["basic", "soft"]:
+            table[hand_class][row][dealer_value][mode in NO_SPLIT_MODES] = rule_eval(hand, dealer, mode)
+    return table
+
+
+STRATEGY_TABLE: list = build_strategy_table()
+
+
+def card_eval(hand: Hand, dealer: Card, mode: str, table: Optional[list] = None) -> str:
+    """Completely evaluate a blackjack hand using basic strategy.
+
+    Two card hands are looked up in the precomputed strategy table, other hands fall back to the rules.
+
+    Args:
+        hand (Hand): player hand
+        dealer (Card): dealer upcard
+        mode (str): evaluation mode
+        table (Optional[list], optional): strategy table generated for a rule set. Defaults to STRATEGY_TABLE.
+
+    Returns:
+        str: optimal choice
+    """
+    if len(hand.cards) != 2:
+        return rule_eval(hand, dealer, mode)
+    hand_class, row = hand_key(hand)
+    return (table or STRATEGY_TABLE)[hand_class][row][dealer.value][mode in NO_SPLIT_MODES]
+
+
+@functools.cache
+def strategy_array() -> "tuple[npt.NDArray[np.int8], npt.NDArray[np.str_], npt.NDArray[np.int8]]":
+    """Convert the strategy table and the card ranks to numpy lookup arrays.
+
+    numpy is imported on first use, so the single hand evaluation does not depend on it.
+
+    Returns:
+        tuple[npt.NDArray[np.int8], npt.NDArray[np.str_], npt.NDArray[np.int8]]: move codes shaped like the
+            strategy table, move names per code, card value per rank code point
+    """
+    import numpy as np
+
+    codes = [
+        [[[MOVES.index(move or "") for move in modes] for modes in row] for row in rows] for rows in STRATEGY_TABLE
+    ]
+    rank_values = np.zeros(max(map(ord, CARD_VALS)) + 1, dtype=np.int8)
+    for rank, value in CARD_VALS.items():
+        rank_values[ord(rank)] = value
+    return np.array(codes, dtype=np.int8), np.array(MOVES), rank_values
+
+
+def card_values(cards: "npt.ArrayLike") -> "npt.NDArray[np.int8]":
+    """Convert an array of card ranks or card values to card values.
+
+    Args:
+        cards (npt.ArrayLike): card ranks ("2"-"9", "T", "J", "Q", "K", "A") or card values
+
+    Returns:
+        npt.NDArray[np.int8]: card values
+    """
+    import numpy as np
+
+    cards = np.asarray(cards)
+    if cards.dtype.kind in "OSU":
+        _, _, rank_values = strategy_array()
+        return rank_values[cards.astype("U1").view(np.uint32)]
+    return cards.astype(np.int8)
+
+
+def card_eval_batch(
+    card1: "npt.ArrayLike", card2: "npt.ArrayLike", dealer_card: "npt.ArrayLike", mode: "npt.ArrayLike" = "basic"
+) -> "npt.NDArray[np.str_]":
+    """Evaluate many two card hands at once using basic strategy.
+
+    Takes the columns of the training_data table and returns the same moves as card_eval for every row.
+
+    Args:
+        card1 (npt.ArrayLike): rank of the first player card
+        card2 (npt.ArrayLike): rank of the second player card
+        dealer_card (npt.ArrayLike): dealer upcard value or rank
+        mode (npt.ArrayLike, optional): evaluation mode, single or per row. Defaults to "basic".
+
+    Returns:
+        npt.NDArray[np.str_]: optimal choice per row
+    """
+    import numpy as np
+
+    codes, moves, _ = strategy_array()
+    value1, value2 = card_values(card1), card_values(card2)
+    is_pair = value1 == value2
+    hand_class = np.where(is_pair, PAIR, np.where((value1 == 11) | (value2 == 11), SOFT, HARD))
+    row = np.where(is_pair, value1, value1 + value2)
+    if isinstance(mode, str):
+        no_split: "int | npt.NDArray[np.int8]" = int(mode in NO_SPLIT_MODES)
+    else:
+        no_split = np.isin(np.asarray(mode, dtype=object), NO_SPLIT_MODES).astype(np.int8)
+    return moves[codes[hand_class, row, card_values(dealer_card), no_split]]
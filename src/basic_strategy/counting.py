@@ -0,0 +1,80 @@
+"""This script contains the Hi-Lo card count and the index plays that deviate from basic strategy."""
+
+from typing import Optional
+
+from src.basic_strategy.card_eval import HARD, NO_SPLIT_MODES, PAIR, card_eval, hand_key
+from src.basic_strategy.hand import CARDS, Card, Hand
+
+HI_LO_VALUES = {2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 0, 8: 0, 9: 0, 10: -1, 11: -1}
+HI_LO: tuple[int, ...] = tuple(HI_LO_VALUES[card.value] for card in CARDS)
+SPLIT_MOVES = ("spl", "das")
+
+# Illustrious 18 without insurance: (hand class, row, dealer value) -> (index, deviation, play at or above index?)
+INDEX_PLAYS: dict[tuple[int, int, int], tuple[int, str, bool]] = {
+    (HARD, 16, 10): (0, "s", True),
+    (HARD, 15, 10): (4, "s", True),
+    (PAIR, 10, 5): (5, "spl", True),
+    (PAIR, 10, 6): (4, "spl", True),
+    (HARD, 10, 10): (4, "d", True),
+    (HARD, 12, 3): (2, "s", True),
+    (HARD, 12, 2): (3, "s", True),
+    (HARD, 11, 11): (1, "d", True),
+    (HARD, 9, 2): (1, "d", True),
+    (HARD, 10, 11): (4, "d", True),
+    (HARD, 9, 7): (3, "d", True),
+    (HARD, 16, 9): (5, "s", True),
+    (HARD, 13, 2): (-1, "h", False),
+    (HARD, 12, 4): (0, "h", False),
+    (HARD, 12, 5): (-2, "h", False),
+    (HARD, 12, 6): (-1, "h", False),
+    (HARD, 13, 3): (-2, "h", False),
+}
+
+
+def true_count(running_count: int, cards_left: int) -> float:
+    """Convert a running count to a true count.
+
+    Args:
+        running_count (int): Hi-Lo running count
+        cards_left (int): cards not yet seen by the player
+
+    Returns:
+        float: running count per remaining deck
+    """
+    return running_count * 52 / max(cards_left, 1)
+
+
+def count_eval(hand: Hand, dealer: Card, mode: str, count: float, table: Optional[list] = None) -> str:
+    """Evaluate a blackjack hand using basic strategy and the index plays for the true count.
+
+    Surrender keeps precedence over the index plays. A pair that is not split, not even after doubling is allowed,
+    uses the index plays of its hard total.
+
+    Args:
+        hand (Hand): player hand
+        dealer (Card): dealer upcard
+        mode (str): evaluation mode
+        count (float): true count
+        table (Optional[list], optional): strategy table generated for a rule set. Defaults to STRATEGY_TABLE.
+
+    Returns:
+        str: optimal choice
+    """
+    move = card_eval(hand, dealer, mode, table)
+    if len(hand.cards) != 2 or move == "sur":
+        return move
+    hand_class, row = hand_key(hand)
+    keys = [(hand_class, row, dealer.value)]
+    if hand_class == PAIR:
+        if mode in NO_SPLIT_MODES:
+            keys = []
+        if not hand.is_soft:
+            keys.append((HARD, hand.value, dealer.value))
+    for key in keys:
+        index_play = INDEX_PLAYS.get(key)
+        if index_play is None or (key[0] == HARD and move in SPLIT_MOVES):
+            continue
+        index, deviation, at_or_above = index_play
+        if (count >= index) == at_or_above:
+            return deviation
+    return move
@@ -0,0 +1,307 @@
+"""This script contains an exact evaluation of blackjack hands from the dealer outcome probabilities."""
+
+import functools
+import json
+import pathlib
+import time
+from typing import Iterable, Iterator, Optional
+
+from src.basic_strategy.hand import Card, Hand
+
+OUTCOMES = ("17", "18", "19", "20", "21", "bust", "blackjack")
+BUST, BLACKJACK = 5, 6
+INFINITE_DRAWS = tuple((value, 4 / 13 if value == 10 else 1 / 13) for value in range(1, 11))
+CACHE_SIZE = 2**18
+DISK_CACHE_FILE = pathlib.Path.cwd() / "db" / "dealer_probs.json"
+# increase when the dealer solver changes, cached distributions of other versions are not reused
+SOLVER_VERSION = 1
+BLACKJACK_PAYOUT = 1.5
+QUERY_STATS = {"queries": 0, "seconds": 0.0, "disk_hits": 0, "disk_misses": 0}
+
+Composition = Optional[tuple[int, ...]]
+
+
+def shoe_composition(decks: Optional[int], cards: Iterable[Card] = ()) -> Composition:
+    """Count the cards left in a shoe.
+
+    Args:
+        decks (Optional[int]): number of decks in the shoe, None for an infinite deck
+        cards (Iterable[Card], optional): cards already removed from the shoe. Defaults to ().
+
+    Returns:
+        Composition: number of aces, twos, ..., nines and ten valued cards left, None for an infinite deck
+    """
+    if decks is None:
+        return None
+    counts = [4 * decks] * 9 + [16 * decks]
+    for card in cards:
+        counts[card.hard_value - 1] -= 1
+    return tuple(counts)
+
+
+def draws(composition: Composition) -> Iterator[tuple[int, float, Composition]]:
+    """Iterate over the possible next cards of a shoe.
+
+    Args:
+        composition (Composition): cards left in the shoe
+
+    Yields:
+        Iterator[tuple[int, float, Composition]]: card value (ace as 1), probability, remaining shoe
+    """
+    if composition is None:
+        for value, probability in INFINITE_DRAWS:
+            yield value, probability, None
+        return
+    total = sum(composition)
+    for index, count in enumerate(composition):
+        if count:
+            yield index + 1, count / total, composition[:index] + (count - 1,) + composition[index + 1 :]  # noqa: E203
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def dealer_outcomes(
+    hard_total: int, has_ace: bool, cards: int, composition: Composition, hit_soft_17: bool
+) -> tuple[float, ...]:
+    """Compute the distribution of final dealer hands from a partial dealer hand.
+
+    Args:
+        hard_total (int): dealer total with aces counted as 1
+        has_ace (bool): does the dealer hold an ace?
+        cards (int): number of dealer cards, only 1, 2 and more matter
+        composition (Composition): cards left in the shoe
+        hit_soft_17 (bool): does the dealer hit soft 17?
+
+    Returns:
+        tuple[float, ...]: probability per outcome in OUTCOMES
+    """
+    soft = has_ace and hard_total <= 11
+    value = hard_total + 10 if soft else hard_total
+    result = [0.0] * len(OUTCOMES)
+    if value > 21:
+        result[BUST] = 1.0
+    elif cards == 2 and value == 21:
+        result[BLACKJACK] = 1.0
+    elif value >= 17 and not (hit_soft_17 and soft and value == 17):
+        result[value - 17] = 1.0
+    else:
+        for card_value, probability, remaining in draws(composition):
+            outcome = dealer_outcomes(
+                hard_total + card_value, has_ace or card_value == 1, min(cards + 1, 3), remaining, hit_soft_17
+            )
+            for index, outcome_probability in enumerate(outcome):
+                result[index] += probability * outcome_probability
+    return tuple(result)
+
+
+def load_disk_cache(path: pathlib.Path = DISK_CACHE_FILE) -> dict[str, list[float]]:
+    """Read the persisted dealer distributions of full shoes.
+
+    A file written by another solver version is ignored.
+
+    Args:
+        path (pathlib.Path, optional): cache file. Defaults to DISK_CACHE_FILE.
+
+    Returns:
+        dict[str, list[float]]: distributions keyed by solver version, decks, upcard and dealer rule
+    """
+    if path.exists():
+        stored = json.loads(path.read_text())
+        if isinstance(stored, dict) and stored.get("version") == SOLVER_VERSION:
+            return stored["distributions"]
+    return {}
+
+
+def save_disk_cache(path: pathlib.Path = DISK_CACHE_FILE) -> None:
+    """Write the dealer distributions of full shoes if the folder of the cache file exists.
+
+    Args:
+        path (pathlib.Path, optional): cache file. Defaults to DISK_CACHE_FILE.
+    """
+    if path.parent.exists():
+        path.write_text(json.dumps({"version": SOLVER_VERSION, "distributions": DISK_CACHE}, indent=1))
+
+
+DISK_CACHE: dict[str, list[float]] = load_disk_cache()
+
+
+def dealer_distribution(
+    upcard: Card, decks: Optional[int] = None, removed: Iterable[Card] = (), hit_soft_17: bool = False
+) -> tuple[float, ...]:
+    """Compute the distribution of the final dealer hand for an upcard.
+
+    Full shoes (nothing but the upcard removed) are persisted on disk, all other shoes are kept in the LRU cache.
+
+    Args:
+        upcard (Card): dealer upcard
+        decks (Optional[int], optional): number of decks, None for an infinite deck. Defaults to None.
+        removed (Iterable[Card], optional): other cards already dealt from the shoe. Defaults to ().
+        hit_soft_17 (bool, optional): does the dealer hit soft 17?. Defaults to False.
+
+    Returns:
+        tuple[float, ...]: probability per outcome in OUTCOMES
+    """
+    start = time.perf_counter()
+    removed = tuple(removed)
+    key = f"{SOLVER_VERSION}|{decks or 'inf'}|{upcard.hard_value}|{int(hit_soft_17)}"
+    if not removed and key in DISK_CACHE:
+        QUERY_STATS["disk_hits"] += 1
+        result = tuple(DISK_CACHE[key])
+    else:
+        composition = shoe_composition(decks, (upcard, *removed))
+        result = dealer_outcomes(upcard.hard_value, upcard.hard_value == 1, 1, composition, hit_soft_17)
+        if not removed:
+            QUERY_STATS["disk_misses"] += 1
+            DISK_CACHE[key] = list(result)
+            save_disk_cache(DISK_CACHE_FILE)
+    QUERY_STATS["queries"] += 1
+    QUERY_STATS["seconds"] += time.perf_counter() - start
+    return result
+
+
+def cache_stats() -> dict[str, float]:
+    """Report the solver cache usage and query latency.
+
+    Returns:
+        dict[str, float]: lru hits, misses and size, disk hits and misses, number of queries, mean query latency
+    """
+    dealer_info = dealer_outcomes.cache_info()
+    player_info = player_outcome.cache_info()
+    queries = QUERY_STATS["queries"]
+    return {
+        "lru_hits": dealer_info.hits + player_info.hits,
+        "lru_misses": dealer_info.misses + player_info.misses,
+        "lru_size": dealer_info.currsize + player_info.currsize,
+        "lru_hit_rate": dealer_info.hits / max(1, dealer_info.hits + dealer_info.misses),
+        "disk_hits": QUERY_STATS["disk_hits"],
+        "disk_misses": QUERY_STATS["disk_misses"],
+        "queries": queries,
+        "mean_query_ms": 1000 * QUERY_STATS["seconds"] / queries if queries else 0.0,
+    }
+
+
+def clear_caches() -> None:
+    """Empty the in memory caches and reset the statistics."""
+    dealer_outcomes.cache_clear()
+    player_outcome.cache_clear()
+    QUERY_STATS.update(queries=0, seconds=0.0, disk_hits=0, disk_misses=0)
+
+
+def stand_outcome(
+    value: int, dealer: tuple[float, ...], natural: bool = False, blackjack_payout: float = BLACKJACK_PAYOUT
+) -> float:
+    """Compute the expected value of standing against a dealer distribution without dealer blackjack.
+
+    A player natural wins the blackjack payout, the dealer has already checked that he has no blackjack.
+
+    Args:
+        value (int): player hand value
+        dealer (tuple[float, ...]): dealer probability per outcome in OUTCOMES
+        natural (bool, optional): is the hand a two card 21 of the initial deal? Defaults to False.
+        blackjack_payout (float, optional): payout of a player natural. Defaults to BLACKJACK_PAYOUT.
+
+    Returns:
+        float: expected win in initial bets
+    """
+    if value > 21:
+        return -1.0
+    if natural and value == 21:
+        return blackjack_payout
+    no_blackjack = 1.0 - dealer[BLACKJACK]
+    ev = dealer[BUST]
+    for index, probability in enumerate(dealer[:BUST]):
+        if value > 17 + index:
+            ev += probability
+        elif value < 17 + index:
+            ev -= probability
+    return ev / no_blackjack
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def player_outcome(
+    hard_total: int, has_ace: bool, upcard: int, composition: Composition, hit_soft_17: bool, action: str
+) -> float:
+    """Compute the expected value of a player hand for stand, hit (then playing optimally) or double.
+
+    The dealer is assumed to have checked for blackjack.
+
+    Args:
+        hard_total (int): player total with aces counted as 1
+        has_ace (bool): does the player hold an ace?
+        upcard (int): dealer upcard value with aces counted as 1
+        composition (Composition): cards left in the shoe
+        hit_soft_17 (bool): does the dealer hit soft 17?
+        action (str): "s" stand, "h" hit or "d" double
+
+    Returns:
+        float: expected win in initial bets
+    """
+    value = hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+    if action == "s" or value > 21:
+        dealer = dealer_outcomes(upcard, upcard == 1, 1, composition, hit_soft_17)
+        return stand_outcome(value, dealer)
+    ev = 0.0
+    for card_value, probability, remaining in draws(composition):
+        next_hand = (hard_total + card_value, has_ace or card_value == 1, upcard, remaining, hit_soft_17)
+        if action == "d":
+            ev += 2 * probability * player_outcome(*next_hand, "s")
+        else:
+            ev += probability * max(player_outcome(*next_hand, "s"), player_outcome(*next_hand, "h"))
+    return ev
+
+
+def action_ev(
+    hand: Hand,
+    dealer: Card,
+    action: str,
+    decks: Optional[int] = None,
+    hit_soft_17: bool = False,
+    blackjack_payout: float = BLACKJACK_PAYOUT,
+) -> float:
+    """Compute the exact expected value of an action for a hand.
+
+    Standing on a two card 21 is paid as a natural.
+
+    Args:
+        hand (Hand): player hand
+        dealer (Card): dealer upcard
+        action (str): "s" stand, "h" hit or "d" double
+        decks (Optional[int], optional): number of decks, None for an infinite deck. Defaults to None.
+        hit_soft_17 (bool, optional): does the dealer hit soft 17?. Defaults to False.
+        blackjack_payout (float, optional): payout of a player natural. Defaults to BLACKJACK_PAYOUT.
+
+    Returns:
+        float: expected win in initial bets
+    """
+    start = time.perf_counter()
+    if action == "s" and len(hand.cards) == 2 and hand.value == 21:
+        ev = stand_outcome(21, (), True, blackjack_payout)
+    else:
+        composition = shoe_composition(decks, (dealer, *hand.cards))
+        ev = player_outcome(hand.hard_total, hand.aces > 0, dealer.hard_value, composition, hit_soft_17, action)
+    QUERY_STATS["queries"] += 1
+    QUERY_STATS["seconds"] += time.perf_counter() - start
+    return ev
+
+
+def exact_eval(
+    hand: Hand,
+    dealer: Card,
+    decks: Optional[int] = None,
+    hit_soft_17: bool = False,
+    blackjack_payout: float = BLACKJACK_PAYOUT,
+) -> dict[str, float]:
+    """Compute the exact expected values of standing, hitting, doubling and surrendering.
+
+    Args:
+        hand (Hand): player hand
+        dealer (Card): dealer upcard
+        decks (Optional[int], optional): number of decks, None for an infinite deck. Defaults to None.
+        hit_soft_17 (bool, optional): does the dealer hit soft 17?. Defaults to False.
+        blackjack_payout (float, optional): payout of a player natural. Defaults to BLACKJACK_PAYOUT.
+
+    Returns:
+        dict[str, float]: expected win in initial bets per action
+    """
+    evs = {action: action_ev(hand, dealer, action, decks, hit_soft_17, blackjack_payout) for action in ["s", "h", "d"]}
+    evs["sur"] = -0.5
+    return evs
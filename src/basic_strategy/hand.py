@@ -42,31 +42,51 @@ RANK_UNICODE: dict = {
 class Card:
     """Class to represent a single card.
 
+    There is exactly one immutable instance per rank and suit, creating a card returns that instance.
+    Whether a card is face up is stored by the Hand holding it.
+
     Raises:
         KeyError: invalid card string
     """
 
+    __slots__ = ("suit", "rank", "value", "hard_value", "rank_code", "suit_code", "code", "unicode_front")
     suit: str
     rank: str
     value: int
+    hard_value: int
+    rank_code: int
+    suit_code: int
+    code: int
     unicode_front: str
     unicode_back: str = chr(0x1F0A0)
-    face_up: bool
 
-    def __init__(self, suit: str, rank: str, face_up: bool = True) -> None:
-        """Initialize the card class.
+    def __new__(cls, suit: str, rank: str) -> "Card":
+        """Return the card instance.
 
         Args:
             suit (str): card suit
             rank (str): card rank
-            face_up (bool, optional): is the card visible?. Defaults to True.
+
+        Returns:
+            Card: shared card instance
+        """
+        return CARD_LOOKUP[f"{rank}{suit}"]
+
+    def __setattr__(self, name: str, value: object) -> None:
+        """Prevent changing a shared card.
+
+        Raises:
+            AttributeError: cards are immutable
         """
-        self.suit = suit
-        self.rank = rank
-        self.value = CARD_VALS[rank]
-        self.face_up = face_up
-        self.unicode_front = chr(SUIT_UNICODE[suit] + RANK_UNICODE[rank])
-        self.unicode = self.display_card()
+        raise AttributeError(f"Card is immutable, cannot set '{name}'")
+
+    def __reduce__(self) -> tuple:
+        """Pickle the card by rank and suit.
+
+        Returns:
+            tuple: constructor and arguments
+        """
+        return Card, (self.suit, self.rank)
 
     def __str__(self) -> str:
         """Return string representation.
@@ -84,26 +104,23 @@ class Card:
         """
         return f"<{self.rank}{self.suit}>"
 
-    def display_card(self) -> str:
+    def display_card(self, face_up: bool = True) -> str:
         """Display the card as unicode.
 
+        Args:
+            face_up (bool, optional): is the card visible?. Defaults to True.
+
         Returns:
             str: card as unicode
         """
-        return self.unicode_front if self.face_up else self.unicode_back
-
-    def turn_card(self) -> None:
-        """Flip the card over."""
-        self.face_up = not self.face_up
-        self.unicode = self.display_card()
+        return self.unicode_front if face_up else self.unicode_back
 
     @staticmethod
-    def from_string(card_str: str, face_up: bool = True) -> "Card":
-        """Create a Card instance from a valid string.
+    def from_string(card_str: str) -> "Card":
+        """Return the Card instance for a valid string.
 
         Args:
             card_str (str): card string (Examples: 8d, As, 2h,...)
-            face_up (bool, optional): Is the card face up?. Defaults to True.
 
         Raises:
             KeyError: Invalid card string.
@@ -111,42 +128,165 @@ class Card:
         Returns:
             Card: Class instance
         """
-        if card_str[0] in CARD_VALS and card_str[1] in SUITS:
-            return Card(card_str[1], card_str[0], face_up)
-        raise KeyError(f"'{card_str}' is not a valid card string")
+        try:
+            return CARD_LOOKUP[card_str]
+        except KeyError:
+            raise KeyError(f"'{card_str}' is not a valid card string") from None
+
+
+def create_cards() -> tuple[Card, ...]:
+    """Create the 52 card instances ordered by their code.
+
+    Returns:
+        tuple[Card, ...]: all cards, card.code is the position in the tuple
+    """
+    cards = []
+    for suit_code, suit in enumerate(SUIT_UNICODE):
+        for rank_code, rank in enumerate(CARD_VALS):
+            card = object.__new__(Card)
+            attributes = {
+                "suit": suit,
+                "rank": rank,
+                "value": CARD_VALS[rank],
+                "hard_value": 1 if rank == "A" else CARD_VALS[rank],
+                "rank_code": rank_code,
+                "suit_code": suit_code,
+                "code": suit_code * len(CARD_VALS) + rank_code,
+                "unicode_front": chr(SUIT_UNICODE[suit] + RANK_UNICODE[rank]),
+            }
+            for name, value in attributes.items():
+                object.__setattr__(card, name, value)
+            cards.append(card)
+    return tuple(cards)
+
+
+CARDS: tuple[Card, ...] = create_cards()
+CARD_LOOKUP: dict[str, Card] = {f"{card.rank}{card.suit}": card for card in CARDS}
 
 
 class Hand:
     """Class to represent a blackjack hand."""
 
     cards: list[Card]
+    face_up: list[bool]
+    hard_total: int
+    aces: int
 
-    def __init__(self, cards: list[Card]) -> None:
+    def __init__(self, cards: list[Card], face_up: list[bool] | None = None) -> None:
         """Initialize a Hand object.
 
         Args:
             cards (list[Card]): Cards present in hand
+            face_up (list[bool] | None, optional): Is each card face up? Defaults to all face up.
+                Both lists are copied, adding or removing cards does not change them.
         """
-        self.cards = cards
-        self.sorted_cards = sorted(cards, key=lambda c: CARD_VALS[c.rank])
-        self.value = self.compute_value()
-        self.rank_str = [card.rank for card in self.cards]
-        self.card_str = "".join([f"{card.rank}{card.suit}" for card in self.cards])
+        self.cards = list(cards)
+        self.face_up = list(face_up) if face_up is not None else [True] * len(cards)
+        self.compute_value()
 
     def compute_value(self) -> int:
-        """Compute the hand value.
+        """Recompute the running totals from all cards in the hand.
+
+        Returns:
+            int: hand value
+        """
+        self.hard_total = sum([card.hard_value for card in self.cards])
+        self.aces = sum([card.hard_value == 1 for card in self.cards])
+        return self.value
+
+    @property
+    def is_soft(self) -> bool:
+        """Is an ace counted as 11?
+
+        Returns:
+            bool: soft hand?
+        """
+        return self.aces > 0 and self.hard_total <= 11
+
+    @property
+    def soft_aces(self) -> int:
+        """Count the aces counted as 11, at most one ace can be.
+
+        Returns:
+            int: number of soft aces
+        """
+        return 1 if self.is_soft else 0
+
+    @property
+    def value(self) -> int:
+        """Return the hand value.
 
         Returns:
             int: hand value
         """
-        naive_val = sum([CARD_VALS[card.rank] for card in self.cards])
-        aces = [card for card in self.cards if card.rank == "A"]
-        if aces and naive_val > 21:
-            val = sum([CARD_VALS[card.rank] for card in self.sorted_cards[: -len(aces)]])
-            if 21 - val > 11:
-                return val + 11 + len(aces) - 1
-            return val + len(aces)
-        return naive_val
+        return self.hard_total + 10 if self.is_soft else self.hard_total
+
+    @property
+    def sorted_cards(self) -> list[Card]:
+        """Return the cards sorted by value.
+
+        Returns:
+            list[Card]: sorted cards
+        """
+        return sorted(self.cards, key=lambda c: c.value)
+
+    @property
+    def rank_str(self) -> list[str]:
+        """Return the card ranks.
+
+        Returns:
+            list[str]: rank per card
+        """
+        return [card.rank for card in self.cards]
+
+    @property
+    def card_str(self) -> str:
+        """Return the chained card strings.
+
+        Returns:
+            str: card string (Example: As8d)
+        """
+        return "".join([f"{card.rank}{card.suit}" for card in self.cards])
+
+    def add_card(self, card: Card, face_up: bool = True) -> None:
+        """Add a card to the hand and update the totals.
+
+        Args:
+            card (Card): card to add
+            face_up (bool, optional): is the card visible?. Defaults to True.
+        """
+        self.cards.append(card)
+        self.face_up.append(face_up)
+        self.hard_total += card.hard_value
+        self.aces += card.hard_value == 1
+
+    def pop_card(self) -> Card:
+        """Remove the last card from the hand and update the totals.
+
+        Returns:
+            Card: removed card
+        """
+        card = self.cards.pop()
+        self.face_up.pop()
+        self.hard_total -= card.hard_value
+        self.aces -= card.hard_value == 1
+        return card
+
+    def turn_card(self, index: int) -> None:
+        """Flip a card of the hand over.
+
+        Args:
+            index (int): position of the card in the hand
+        """
+        self.face_up[index] = not self.face_up[index]
+
+    def display_cards(self) -> list[str]:
+        """Display the cards of the hand as unicode.
+
+        Returns:
+            list[str]: cards as unicode, face down cards show their back
+        """
+        return [card.display_card(up) for card, up in zip(self.cards, self.face_up)]
 
     @staticmethod
     def from_string(hands: str | list, face_up: list[bool] | str | list[str] = "") -> "Hand":
@@ -164,6 +304,6 @@ class Hand:
             hands = [hands[0 + i : 2 + i] for i in range(0, len(hands), 2)]  # noqa: E203
         if isinstance(face_up, str):
             face_up = list(face_up)
-        face_bool = map(bool, map(int, face_up))
-        cards = [Card.from_string(card, up) for card, up in zip(hands, face_bool)]
-        return Hand(cards)
+        face_bool = list(map(bool, map(int, face_up)))[: len(hands)]
+        cards = [Card.from_string(card) for card, _ in zip(hands, face_bool)]
+        return Hand(cards, face_bool)
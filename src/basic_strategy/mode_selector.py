@@ -1,36 +1,182 @@
 """This script contains functions to deal cards and create card decks."""
 
-import itertools
+import array
 import random
+import threading
+from typing import Iterable, Optional
 
-from src.basic_strategy.hand import Card
+from src.basic_strategy.counting import HI_LO, true_count
+from src.basic_strategy.hand import CARDS, Card
 
 SUITS = ["h", "c", "s", "d"]
 RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
+DECK_VIEW: tuple[int, ...] = tuple(card.code for card in CARDS)
+SOFT_VIEW: tuple[int, ...] = tuple(card.code for card in CARDS if card.rank in RANKS[:-5])
+HARD_VIEW: tuple[int, ...] = tuple(card.code for card in CARDS if card.rank in RANKS[:-1])
+ACE = Card("s", "A")
 
 
-def deal_solo_cards(mode: str) -> list[Card]:
+class Shoe:
+    """Class to represent a shoe of one or more decks.
+
+    The cards are stored as card codes in a preallocated array. Every deal swaps a random not yet dealt card to the
+    cursor position (an in place Fisher-Yates shuffle run one step per card), so reshuffling only resets the cursor.
+    Shoes shared between threads are dealt from while holding their lock.
+    """
+
+    def __init__(
+        self,
+        decks: int = 1,
+        penetration: float = 1.0,
+        view: Iterable[int] = DECK_VIEW,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize the shoe.
+
+        Args:
+            decks (int, optional): number of decks. Defaults to 1.
+            penetration (float, optional): share of the shoe dealt before reshuffling. Defaults to 1.0.
+            view (Iterable[int], optional): codes of the cards in one deck. Defaults to all 52 cards.
+            seed (Optional[int], optional): random seed. Defaults to None.
+        """
+        self.codes = array.array("B", view) * decks
+        self.cut_card = int(len(self.codes) * penetration)
+        self.rng = random.Random(seed)
+        self.cursor = 0
+        self.lock = threading.RLock()
+
+    def shuffle(self) -> None:
+        """Put all dealt cards back into the shoe."""
+        self.cursor = 0
+
+    @property
+    def needs_shuffle(self) -> bool:
+        """Is the cut card reached?
+
+        Returns:
+            bool: reshuffle before the next round?
+        """
+        return self.cursor >= self.cut_card
+
+    @property
+    def cards_left(self) -> int:
+        """Count the cards that can still be dealt.
+
+        Returns:
+            int: undealt cards
+        """
+        return len(self.codes) - self.cursor
+
+    def deal_code(self) -> int:
+        """Deal the code of the next card, reshuffle if the shoe is empty.
+
+        Returns:
+            int: card code
+        """
+        codes, cursor = self.codes, self.cursor
+        if cursor == len(codes):
+            cursor = 0
+        swap = cursor + int(self.rng.random() * (len(codes) - cursor))
+        codes[cursor], codes[swap] = codes[swap], codes[cursor]
+        self.cursor = cursor + 1
+        return codes[cursor]
+
+    def deal(self) -> Card:
+        """Deal the next card.
+
+        Returns:
+            Card: dealt card
+        """
+        return CARDS[self.deal_code()]
+
+    def deal_cards(self, k: int) -> list[Card]:
+        """Deal several cards.
+
+        Args:
+            k (int): number of cards
+
+        Returns:
+            list[Card]: dealt cards
+        """
+        return [CARDS[self.deal_code()] for _ in range(k)]
+
+
+class CountingShoe(Shoe):
+    """Class to represent a shoe that keeps the Hi-Lo running count of all dealt cards."""
+
+    def __init__(self, decks: int = 6, penetration: float = 0.75, seed: Optional[int] = None) -> None:
+        """Initialize the shoe.
+
+        Args:
+            decks (int, optional): number of decks. Defaults to 6.
+            penetration (float, optional): share of the shoe dealt before reshuffling. Defaults to 0.75.
+            seed (Optional[int], optional): random seed. Defaults to None.
+        """
+        super().__init__(decks, penetration, seed=seed)
+        self.running_count = 0
+
+    def shuffle(self) -> None:
+        """Put all dealt cards back into the shoe and reset the count."""
+        super().shuffle()
+        self.running_count = 0
+
+    @property
+    def true_count(self) -> float:
+        """Return the running count per remaining deck.
+
+        Returns:
+            float: true count
+        """
+        return true_count(self.running_count, self.cards_left)
+
+    def deal_code(self) -> int:
+        """Deal the code of the next card and update the running count.
+
+        Returns:
+            int: card code
+        """
+        if self.cursor == len(self.codes):
+            self.running_count = 0
+        code = super().deal_code()
+        self.running_count += HI_LO[code]
+        return code
+
+
+COUNT_SHOE = CountingShoe()
+MODE_SHOES: dict[str, Shoe] = {
+    "basic": Shoe(view=DECK_VIEW),
+    "split": Shoe(view=DECK_VIEW),
+    "soft": Shoe(view=SOFT_VIEW),
+    "hard": Shoe(view=HARD_VIEW),
+    "count": COUNT_SHOE,
+}
+
+
+def deal_solo_cards(mode: str, shoe: Optional[Shoe] = None) -> list[Card]:
     """Deal cards to a single player and the dealer.
 
+    In count mode the cards are dealt one after another from a persistent shoe until the cut card is reached.
+    The shoe is locked while dealing, so concurrent callbacks never receive the same card.
+
     Args:
-        mode (str): selected mode, influences which deck is created.
+        mode (str): selected mode, influences which deck is used.
+        shoe (Optional[Shoe], optional): shoe for count mode. Defaults to a shared six deck shoe.
 
     Returns:
         list[Card]: dealt cards
     """
-    deck = [Card(s, r) for s, r in itertools.product(SUITS, RANKS)]
-    if mode == "split":
-        cards = random.sample(deck, k=3)
-        return [cards[0], *cards]
-    if mode == "soft":
-        ranks = RANKS[:-5]
-        deck = [Card(s, r) for s, r in itertools.product(SUITS, ranks)]
-        cards = random.sample(deck, k=3)
-        return [Card("s", "A"), *cards]
-    if mode == "hard":
-        ranks = RANKS[:-1]
-        deck = [Card(s, r) for s, r in itertools.product(SUITS, ranks)]
-        cards = random.sample(deck, k=4)
-        return cards
-    cards = random.sample(deck, k=4)
-    return cards
+    if mode == "count":
+        shoe = shoe or COUNT_SHOE
+        with shoe.lock:
+            if shoe.needs_shuffle:
+                shoe.shuffle()
+            return shoe.deal_cards(4)
+    shoe = MODE_SHOES.get(mode, MODE_SHOES["basic"])
+    with shoe.lock:
+        shoe.shuffle()
+        if mode == "split":
+            cards = shoe.deal_cards(3)
+            return [cards[0], *cards]
+        if mode == "soft":
+            return [ACE, *shoe.deal_cards(3)]
+        return shoe.deal_cards(4)
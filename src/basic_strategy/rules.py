@@ -0,0 +1,31 @@
+"""This script contains the house rules a blackjack game is played with."""
+
+import dataclasses
+import hashlib
+import json
+
+# increase when the strategy generator changes, tables of older generators are then generated again
+GENERATOR_VERSION = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class Rules:
+    """Class to represent a set of house rules."""
+
+    decks: int = 6
+    hit_soft_17: bool = False
+    double_after_split: bool = True
+    late_surrender: bool = True
+    resplit_aces: bool = False
+    blackjack_payout: float = 1.5
+    max_hands: int = 4
+
+    @property
+    def key(self) -> str:
+        """Return a short hash identifying the rule set and the strategy generator version.
+
+        Returns:
+            str: hex digest of the rules
+        """
+        rules_json = json.dumps({**dataclasses.asdict(self), "generator": GENERATOR_VERSION}, sort_keys=True)
+        return hashlib.sha1(rules_json.encode()).hexdigest()[:16]
@@ -0,0 +1,190 @@
+"""This script contains functions to generate the optimal two card strategy for a set of house rules."""
+
+import itertools
+import json
+import pathlib
+from typing import Optional
+
+from src.basic_strategy.card_eval import PAIR, hand_key
+from src.basic_strategy.exact_eval import (
+    Composition,
+    dealer_outcomes,
+    shoe_composition,
+    stand_outcome,
+)
+from src.basic_strategy.hand import CARD_VALS, Card, Hand
+from src.basic_strategy.rules import Rules
+
+STRATEGY_CACHE_DIR = pathlib.Path.cwd() / "db" / "strategy"
+STRATEGY_TABLES: dict[Rules, list] = {}
+
+
+def draw_probabilities(composition: Composition) -> list[tuple[int, float]]:
+    """Compute the probability of drawing each card value.
+
+    Args:
+        composition (Composition): cards left in the shoe, None for an infinite deck
+
+    Returns:
+        list[tuple[int, float]]: card value (ace as 1) and probability
+    """
+    if composition is None:
+        return [(value, 4 / 13 if value == 10 else 1 / 13) for value in range(1, 11)]
+    total = sum(composition)
+    return [(index + 1, count / total) for index, count in enumerate(composition) if count]
+
+
+def player_evs(dealer: tuple[float, ...], draws: list[tuple[int, float]]) -> dict[tuple[int, bool], tuple]:
+    """Compute the stand, hit and double EVs of every player total against a fixed dealer distribution.
+
+    The shoe composition is taken as fixed after the initial deal, so the result only depends on the total.
+
+    Args:
+        dealer (tuple[float, ...]): dealer probability per outcome in exact_eval.OUTCOMES
+        draws (list[tuple[int, float]]): probability per card value
+
+    Returns:
+        dict[tuple[int, bool], tuple]: stand, hit and double EV per (hard total, holds an ace)
+    """
+    evs: dict[tuple[int, bool], tuple] = {}
+    for hard_total in range(21, 1, -1):
+        for has_ace in [True, False]:
+            value = hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+            hit = double = 0.0
+            for card_value, probability in draws:
+                next_total = hard_total + card_value
+                if next_total > 21:
+                    hit -= probability
+                    double -= 2 * probability
+                    continue
+                stand_next, hit_next, _ = evs[(next_total, has_ace or card_value == 1)]
+                hit += probability * max(stand_next, hit_next)
+                double += 2 * probability * stand_next
+            evs[(hard_total, has_ace)] = (stand_outcome(value, dealer), hit, double)
+    return evs
+
+
+def split_ev(card: Card, evs: dict[tuple[int, bool], tuple], draws: list[tuple[int, float]], rules: Rules) -> float:
+    """Approximate the EV of splitting a pair, both hands are played independently.
+
+    Split aces receive one card each. Resplitting is only considered for aces, one level deep.
+
+    Args:
+        card (Card): card of the pair
+        evs (dict[tuple[int, bool], tuple]): player EVs from player_evs
+        draws (list[tuple[int, float]]): probability per card value
+        rules (Rules): house rules
+
+    Returns:
+        float: expected win in initial bets of both hands together
+    """
+    is_ace = card.hard_value == 1
+    hand_ev = 0.0
+    for card_value, probability in draws:
+        stand, hit, double = evs[(card.hard_value + card_value, is_ace or card_value == 1)]
+        if is_ace:
+            hand_ev += probability * stand
+        else:
+            hand_ev += probability * max(stand, hit, double if rules.double_after_split else stand)
+    if is_ace and rules.resplit_aces:
+        ace_probability = dict(draws).get(1, 0.0)
+        hand_ev += ace_probability * max(0.0, 2 * hand_ev - evs[(2, True)][0])
+    return 2 * hand_ev
+
+
+def best_move(evs: tuple, split: Optional[float], rules: Rules) -> str:
+    """Choose the move with the highest EV.
+
+    Args:
+        evs (tuple): stand, hit and double EV of the hand
+        split (Optional[float]): split EV, None if splitting is not possible
+        rules (Rules): house rules
+
+    Returns:
+        str: optimal choice ("s", "h", "d", "ds", "spl" or "sur")
+    """
+    stand, hit, double = evs
+    options = {"s": stand, "h": hit, "d": double}
+    if split is not None:
+        options["spl"] = split
+    if rules.late_surrender:
+        options["sur"] = -0.5
+    move = max(options, key=lambda option: options[option])
+    if move == "d" and stand > hit:
+        return "ds"
+    return move
+
+
+def generate_strategy(rules: Rules) -> list:
+    """Compute the optimal strategy table for a set of house rules.
+
+    The table has the same layout as card_eval.STRATEGY_TABLE.
+
+    Args:
+        rules (Rules): house rules
+
+    Returns:
+        list: nested strategy table, unreachable entries are None
+    """
+    table: list = [[[[None, None] for _ in range(12)] for _ in range(22)] for _ in range(3)]
+    ranks = {value: rank for rank, value in CARD_VALS.items()}
+    for value1, value2, dealer_value in itertools.product(ranks, repeat=3):
+        hand = Hand([Card("s", ranks[value1]), Card("h", ranks[value2])])
+        hand_class, row = hand_key(hand)
+        if table[hand_class][row][dealer_value][0] is not None:
+            continue
+        dealer = Card("d", ranks[dealer_value])
+        composition = shoe_composition(rules.decks, (dealer, *hand.cards))
+        dealer_dist = dealer_outcomes(dealer.hard_value, dealer.hard_value == 1, 1, composition, rules.hit_soft_17)
+        draws = draw_probabilities(composition)
+        evs = player_evs(dealer_dist, draws)
+        if hand.value == 21:
+            moves = ["s", "s"]
+        else:
+            hand_evs = evs[(hand.hard_total, hand.aces > 0)]
+            split = split_ev(hand.cards[0], evs, draws, rules) if hand_class == PAIR else None
+            moves = [best_move(hand_evs, split, rules), best_move(hand_evs, None, rules)]
+        table[hand_class][row][dealer_value] = moves
+    return table
+
+
+def strategy_table(rules: Rules) -> list:
+    """Return the strategy table for a set of house rules.
+
+    Tables are cached in memory and on disk, keyed by the rules hash. Missing tables are generated.
+
+    Args:
+        rules (Rules): house rules
+
+    Returns:
+        list: nested strategy table with the layout of card_eval.STRATEGY_TABLE
+    """
+    if rules in STRATEGY_TABLES:
+        return STRATEGY_TABLES[rules]
+    cache_file = STRATEGY_CACHE_DIR / f"{rules.key}.json"
+    if cache_file.exists():
+        table = json.loads(cache_file.read_text())["table"]
+    else:
+        table = generate_strategy(rules)
+        if STRATEGY_CACHE_DIR.parent.exists():
+            STRATEGY_CACHE_DIR.mkdir(exist_ok=True)
+            cache_file.write_text(json.dumps({"rules": rules.__dict__, "table": table}))
+    STRATEGY_TABLES[rules] = table
+    return table
+
+
+def warm_strategy_tables(rules: Optional[Rules] = None) -> None:
+    """Load all cached strategy tables and make sure the table for the given rules exists.
+
+    Tables of other generator versions are skipped, their file name is not the current rules key.
+
+    Args:
+        rules (Optional[Rules], optional): rules to generate the table for. Defaults to Rules().
+    """
+    if STRATEGY_CACHE_DIR.exists():
+        for cache_file in STRATEGY_CACHE_DIR.glob("*.json"):
+            cached = json.loads(cache_file.read_text())
+            cached_rules = Rules(**cached["rules"])
+            if cache_file.stem == cached_rules.key:
+                STRATEGY_TABLES.setdefault(cached_rules, cached["table"])
+    strategy_table(rules or Rules())
@@ -0,0 +1 @@
+"""This module contains the Monte Carlo simulation of the basic strategy."""
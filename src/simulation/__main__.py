@@ -0,0 +1,34 @@
+"""Simulate the basic strategy from the command line and report its expected value."""
+
+import argparse
+
+from src.basic_strategy.rules import Rules
+from src.simulation.engine import TARGET_ROUNDS_PER_SECOND, simulate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=10**6)
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--penetration", type=float, default=0.75)
+    parser.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    parser.add_argument("--no-das", action="store_true", help="no double after split")
+    parser.add_argument("--no-surrender", action="store_true", help="no late surrender")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--report-every", type=int, default=100_000)
+    args = parser.parse_args()
+    rules = Rules(
+        decks=args.decks,
+        hit_soft_17=args.h17,
+        double_after_split=not args.no_das,
+        late_surrender=not args.no_surrender,
+    )
+    for result in simulate(args.rounds, rules, args.penetration, args.seed, args.report_every):
+        print(
+            f"{result.rounds:>12,} rounds | EV {result.ev:+.5f} ± {result.std_error:.5f} | "
+            f"variance {result.variance:.4f} | {result.rounds_per_second:,.0f} rounds/s"
+        )
+    print("action frequencies:")
+    for action, share in sorted(result.action_frequencies.items(), key=lambda item: -item[1]):
+        print(f"  {action:>3}: {share:.4f}")
+    status = "met" if result.rounds_per_second >= TARGET_ROUNDS_PER_SECOND else "missed"
+    print(f"throughput target of {TARGET_ROUNDS_PER_SECOND:,} rounds/s {status}")
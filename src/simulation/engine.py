@@ -0,0 +1,273 @@
+"""This script contains the Monte Carlo engine to play complete blackjack rounds."""
+
+import collections
+import dataclasses
+import time
+from typing import Generator, Optional
+
+from src.basic_strategy.card_eval import card_eval, should_double, should_split
+from src.basic_strategy.hand import Card, Hand
+from src.basic_strategy.mode_selector import Shoe
+from src.basic_strategy.rules import Rules
+
+TARGET_ROUNDS_PER_SECOND = 50_000
+SURRENDER = -1
+
+
+def representative_hands() -> dict[tuple[bool, int], Hand]:
+    """Create a two card hand for every soft and hard total.
+
+    Hands with more than two cards are evaluated like the two card hand with the same total.
+    Only totals below 21 are needed, the player never acts on 21.
+
+    Returns:
+        dict[tuple[bool, int], Hand]: two card hand per (is soft, hand value)
+    """
+    hands = {(True, value): Hand([Card("s", "A"), Card("h", str(value - 11))]) for value in range(13, 21)}
+    hands.update({(False, value): Hand([Card("s", "2"), Card("h", str(value - 2))]) for value in range(4, 12)})
+    hands.update({(False, value): Hand([Card("s", str(value - 10)), Card("h", "T")]) for value in range(12, 20)})
+    hands[(False, 20)] = Hand([Card("s", "T"), Card("h", "T")])
+    return hands
+
+
+REPRESENTATIVE_HANDS = representative_hands()
+
+
+@dataclasses.dataclass(frozen=True)
+class SimulationResult:
+    """Class to represent the (intermediate) result of a simulation."""
+
+    rounds: int
+    total_return: float
+    total_squared_return: float
+    action_counts: dict[str, int]
+    seconds: float
+
+    @property
+    def ev(self) -> float:
+        """Return the expected value per hand in initial bets.
+
+        Returns:
+            float: mean return per round
+        """
+        return self.total_return / self.rounds if self.rounds else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Return the sample variance of the return per round.
+
+        Returns:
+            float: variance per round
+        """
+        if self.rounds < 2:
+            return 0.0
+        return (self.total_squared_return - self.rounds * self.ev**2) / (self.rounds - 1)
+
+    @property
+    def std_error(self) -> float:
+        """Return the standard error of the expected value.
+
+        Returns:
+            float: standard error
+        """
+        return (self.variance / self.rounds) ** 0.5 if self.rounds else 0.0
+
+    @property
+    def action_frequencies(self) -> dict[str, float]:
+        """Return how often each action was taken relative to all decisions.
+
+        Returns:
+            dict[str, float]: share per action
+        """
+        decisions = sum(self.action_counts.values())
+        return {action: count / decisions for action, count in self.action_counts.items()} if decisions else {}
+
+    @property
+    def rounds_per_second(self) -> float:
+        """Return the simulation throughput.
+
+        Returns:
+            float: simulated rounds per second
+        """
+        return self.rounds / self.seconds if self.seconds else 0.0
+
+
+def decide(hand: Hand, upcard: Card, rules: Rules, can_split: bool, can_double: bool, can_surrender: bool) -> str:
+    """Choose the action for a hand using the basic strategy.
+
+    Args:
+        hand (Hand): player hand
+        upcard (Card): dealer upcard
+        rules (Rules): house rules
+        can_split (bool): is splitting allowed for this hand?
+        can_double (bool): is doubling allowed for this hand?
+        can_surrender (bool): is surrendering allowed for this hand?
+
+    Returns:
+        str: action ("s" stand, "h" hit, "d" double, "spl" split, "sur" surrender)
+    """
+    if len(hand.cards) != 2:
+        hand = REPRESENTATIVE_HANDS[(hand.is_soft, hand.value)]
+        can_split = False
+    move = card_eval(hand, upcard, "basic" if can_split else "hard")
+    if move == "sur" and not can_surrender:
+        move = (should_split(hand, upcard) if can_split else None) or should_double(hand, upcard)
+    if move == "das":
+        move = "spl" if rules.double_after_split else should_double(hand, upcard)
+    if move == "d":
+        return "d" if can_double else "h"
+    if move == "ds":
+        return "d" if can_double else "s"
+    return move
+
+
+def play_hand(
+    shoe: Shoe, rules: Rules, hand: Hand, upcard: Card, actions: collections.Counter, hands: list[int]
+) -> list[tuple[int, int]]:
+    """Play a player hand until it stands, busts, doubles or surrenders.
+
+    Args:
+        shoe (Shoe): shoe to draw from
+        rules (Rules): house rules
+        hand (Hand): player hand
+        upcard (Card): dealer upcard
+        actions (collections.Counter): action counts to update
+        hands (list[int]): single item list with the number of hands of this round (changes on split)
+
+    Returns:
+        list[tuple[int, int]]: final value and stake per resulting hand, SURRENDER for surrendered hands
+    """
+    is_split = hands[0] > 1
+    split_aces = is_split and hand.cards[0].rank == "A"
+    while hand.value < 21:
+        is_pair = len(hand.cards) == 2 and hand.cards[0].value == hand.cards[1].value
+        can_split = is_pair and hands[0] < rules.max_hands and (not split_aces or rules.resplit_aces)
+        if split_aces and not can_split:
+            break
+        move = decide(
+            hand,
+            upcard,
+            rules,
+            can_split=can_split,
+            can_double=len(hand.cards) == 2 and (not is_split or rules.double_after_split),
+            can_surrender=len(hand.cards) == 2 and not is_split and rules.late_surrender,
+        )
+        actions[move] += 1
+        if move == "s":
+            break
+        if move == "sur":
+            return [(SURRENDER, 1)]
+        if move == "d":
+            hand.add_card(shoe.deal())
+            return [(hand.value, 2)]
+        if move == "spl":
+            hands[0] += 1
+            results = []
+            for card in hand.cards:
+                results += play_hand(shoe, rules, Hand([card, shoe.deal()]), upcard, actions, hands)
+            return results
+        hand.add_card(shoe.deal())
+    return [(hand.value, 1)]
+
+
+def play_dealer(shoe: Shoe, rules: Rules, dealer: Hand) -> int:
+    """Draw dealer cards until the dealer stands.
+
+    Args:
+        shoe (Shoe): shoe to draw from
+        rules (Rules): house rules
+        dealer (Hand): dealer hand
+
+    Returns:
+        int: final dealer value
+    """
+    while dealer.value < 17 or (rules.hit_soft_17 and dealer.value == 17 and dealer.is_soft):
+        dealer.add_card(shoe.deal())
+    return dealer.value
+
+
+def play_round(shoe: Shoe, rules: Rules, actions: collections.Counter) -> float:
+    """Play a complete round with one player against the dealer.
+
+    Args:
+        shoe (Shoe): shoe to draw from
+        rules (Rules): house rules
+        actions (collections.Counter): action counts to update
+
+    Returns:
+        float: player win or loss in initial bets
+    """
+    first, upcard, second, hole = shoe.deal(), shoe.deal(), shoe.deal(), shoe.deal()
+    player = Hand([first, second])
+    dealer = Hand([upcard, hole])
+    if player.value == 21:
+        return 0.0 if dealer.value == 21 else rules.blackjack_payout
+    if dealer.value == 21:
+        return -1.0
+    results = play_hand(shoe, rules, player, upcard, actions, [1])
+    if all(value > 21 or value == SURRENDER for value, _ in results):
+        dealer_value = 0
+    else:
+        dealer_value = play_dealer(shoe, rules, dealer)
+    outcome = 0.0
+    for value, stake in results:
+        if value == SURRENDER:
+            outcome -= 0.5
+        elif value > 21 or value < dealer_value <= 21:
+            outcome -= stake
+        elif dealer_value > 21 or value > dealer_value:
+            outcome += stake
+    return outcome
+
+
+def simulate(
+    rounds: int,
+    rules: Rules = Rules(),
+    penetration: float = 0.75,
+    seed: Optional[int] = None,
+    report_every: int = 100_000,
+) -> Generator[SimulationResult, None, None]:
+    """Simulate rounds and stream the intermediate results.
+
+    Args:
+        rounds (int): number of rounds to play
+        rules (Rules, optional): house rules. Defaults to Rules().
+        penetration (float, optional): share of the shoe dealt before reshuffling. Defaults to 0.75.
+        seed (Optional[int], optional): random seed. Defaults to None.
+        report_every (int, optional): rounds between two progress reports. Defaults to 100_000.
+
+    Yields:
+        Generator[SimulationResult, None, None]: results so far, the last one covers all rounds
+    """
+    shoe = Shoe(rules.decks, penetration, seed=seed)
+    actions: collections.Counter = collections.Counter()
+    total = squared = 0.0
+    start = time.perf_counter()
+    for played in range(1, rounds + 1):
+        if shoe.needs_shuffle:
+            shoe.shuffle()
+        outcome = play_round(shoe, rules, actions)
+        total += outcome
+        squared += outcome * outcome
+        if played % report_every == 0 or played == rounds:
+            yield SimulationResult(played, total, squared, dict(actions), time.perf_counter() - start)
+
+
+def run_simulation(
+    rounds: int, rules: Rules = Rules(), penetration: float = 0.75, seed: Optional[int] = None
+) -> SimulationResult:
+    """Simulate rounds and return the final result.
+
+    Args:
+        rounds (int): number of rounds to play
+        rules (Rules, optional): house rules. Defaults to Rules().
+        penetration (float, optional): share of the shoe dealt before reshuffling. Defaults to 0.75.
+        seed (Optional[int], optional): random seed. Defaults to None.
+
+    Returns:
+        SimulationResult: result over all rounds
+    """
+    result = SimulationResult(0, 0.0, 0.0, {}, 0.0)
+    for result in simulate(rounds, rules, penetration, seed, report_every=rounds):
+        pass
+    return result
@@ -2,11 +2,21 @@
 
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import sqlalchemy as sa
 from plotly import graph_objects as go
 
-from src import EXT_TABLE_DTYPES, TABLE_DTYPES, engine
+from src import (
+    EXT_TABLE_DTYPES,
+    TABLE_DTYPES,
+    engine,
+    ensure_schema,
+    training_daily_rollup,
+    training_data,
+)
+from src.stats.dataset import add_plot_columns
+from src.storage.columnar import AnswerLog, answer_store
 
 COLOR_DICT = {
     "d": "#00ff00",
@@ -21,25 +31,22 @@ COLOR_DICT = {
 }
 
 
-def get_data() -> pd.DataFrame:
+def get_data(engine: sa.engine.Engine = engine) -> pd.DataFrame:
     """Read data from database.
 
+    Args:
+        engine (sa.engine.Engine, optional): database engine. Defaults to engine.
+
     Returns:
         pd.DataFrame: data from database
     """
-    table = sa.Table("training_data", sa.MetaData(), autoload_with=engine)
-    stmt = sa.select(table)
+    store = answer_store(engine)
+    if isinstance(store, AnswerLog):
+        return add_plot_columns(store.frame())
+    ensure_schema(engine)
     with engine.begin() as conn:
-        dataframe = pd.read_sql(
-            stmt,
-            conn,
-            index_col="index",
-            dtype=TABLE_DTYPES,
-        )
-    dataframe["date"] = dataframe["upload_time"].dt.date
-    dataframe["count"] = 1
-    dataframe["total"] = 1
-    return dataframe
+        dataframe = pd.read_sql(sa.select(training_data), conn, index_col="id", dtype=TABLE_DTYPES)
+    return add_plot_columns(dataframe)
 
 
 def filter_data(
@@ -112,6 +119,71 @@ def transform_data(dataframe: pd.DataFrame, group_list: list) -> pd.DataFrame:
     return df_g
 
 
+def aggregate_query(
+    group_list: list,
+    user_list: Optional[list] = None,
+    mode_list: Optional[list] = None,
+    move_list: Optional[list] = None,
+) -> sa.Select:
+    """Build the query that filters and aggregates the daily rollup like filter_data and transform_data.
+
+    Args:
+        group_list (list): columns to aggregate on, starting with date
+        user_list (Optional[list], optional): user to filter on. Defaults to None.
+        mode_list (Optional[list], optional): modes to filter on. Defaults to None.
+        move_list (Optional[list], optional): moves to filter on. Defaults to None.
+
+    Returns:
+        sa.Select: query returning the group columns, was_correct, count and total
+    """
+    rollup = training_daily_rollup.c
+    group_columns = [rollup[column] for column in group_list]
+    count = sa.func.sum(rollup["count"])
+    stmt = sa.select(
+        *group_columns,
+        rollup.was_correct,
+        count.label("count"),
+        sa.func.sum(count).over(partition_by=group_columns).label("total"),
+    )
+    if user_list:
+        stmt = stmt.where(rollup.user.in_(user_list))
+    if mode_list:
+        stmt = stmt.where(rollup.training_type.in_(mode_list))
+    if move_list:
+        stmt = stmt.where(sa.or_(rollup.correct_move.in_(move_list), rollup.guessed_move.in_(move_list)))
+    grouping = group_columns + [rollup.was_correct]
+    return stmt.group_by(*grouping).order_by(*grouping)
+
+
+def read_aggregates(
+    engine: sa.engine.Engine,
+    group_list: list,
+    user_list: Optional[list] = None,
+    mode_list: Optional[list] = None,
+    move_list: Optional[list] = None,
+) -> pd.DataFrame:
+    """Read the aggregated data from the daily rollup, or from the answer log if it is the selected backend.
+
+    Args:
+        engine (sa.engine.Engine): database engine
+        group_list (list): columns to aggregate on, starting with date
+        user_list (Optional[list], optional): user to filter on. Defaults to None.
+        mode_list (Optional[list], optional): modes to filter on. Defaults to None.
+        move_list (Optional[list], optional): moves to filter on. Defaults to None.
+
+    Returns:
+        pd.DataFrame: aggregated data
+    """
+    store = answer_store(engine)
+    if isinstance(store, AnswerLog):
+        return store.aggregate(group_list, user_list, mode_list, move_list)
+    ensure_schema(engine)
+    with engine.begin() as conn:
+        dataframe = pd.read_sql(aggregate_query(group_list, user_list, mode_list, move_list), conn)
+    dtypes = {column: dtype for column, dtype in EXT_TABLE_DTYPES.items() if column in dataframe}
+    return dataframe.astype(dtypes)
+
+
 def plot_figure(
     dataframe: pd.DataFrame,
     data_col: str,
@@ -121,6 +193,8 @@ def plot_figure(
 ) -> dict[str, dict[str, go.Figure]]:
     """Plot the graphs for the aggregated data.
 
+    The rows of all traces are found in one groupby pass, the traces keep the order in which their groups appear.
+
     Args:
         dataframe (pd.DataFrame): aggregated data
         data_col (str): plot value column
@@ -131,55 +205,60 @@ def plot_figure(
     Returns:
         dict[str, dict[str, go.Figure]]: dict containing users and modes as keys and graphs as values.
     """
-    fig_dict: dict = {}
-    if user_list:
-        user_df_dict = {user: dataframe.loc[dataframe.user == user, :].copy() for user in user_list}
+    keys = ["user"] if user_list else []
+    keys += ["training_type"] if mode_list else []
+    keys += ["was_correct"] + (["correct_move"] if move_list else [])
+    dates = dataframe["date"].to_numpy()
+    if dates.dtype == object:
+        # date objects are serialized as ISO dates, strings are much cheaper to copy into the figures
+        dates = np.datetime_as_string(pd.to_datetime(dataframe["date"]).to_numpy(), unit="D")
+    if data_col == "percent":
+        values = (dataframe["count"] / dataframe["total"]).to_numpy()
     else:
-        user_df_dict = {"all user": dataframe}
-    for user, dataframe in user_df_dict.items():
-        fig_dict[user] = {}
-        if mode_list:
-            mode_df_dict = {mode: dataframe.loc[dataframe.training_type == mode, :].copy() for mode in mode_list}
-        else:
-            mode_df_dict = {"all_modes": dataframe}
-        for mode, dataframe in mode_df_dict.items():
-            fig = go.Figure()
-            legend_dict = dict.fromkeys(dataframe.was_correct.unique(), True)
-            if move_list:
-                legend_dict_move = dict.fromkeys(dataframe.correct_move.unique(), True)
-            for val in dataframe.was_correct.unique():
-                df_f = dataframe.loc[dataframe.was_correct == val, :].copy()
+        values = dataframe[data_col].to_numpy()
+    groups: dict[tuple, dict] = {}
+    indices = dataframe.groupby(keys, sort=False).indices
+    for key, positions in sorted(indices.items(), key=lambda item: item[1][0]):
+        key = key if isinstance(key, tuple) else (key,)
+        graph = (
+            key[0] if user_list else "all user",
+            key[len(keys) - 2 - bool(move_list)] if mode_list else "all_modes",
+        )
+        val = key[len(keys) - 1 - bool(move_list)]
+        groups.setdefault(graph, {}).setdefault(val, []).append((key[-1], positions))
+    traces: dict[tuple, list[dict]] = {}
+    for graph, val_groups in groups.items():
+        shown = set()
+        traces[graph] = []
+        for val, typ_groups in val_groups.items():
+            for typ, positions in typ_groups:
                 if move_list:
-                    for typ in df_f.correct_move.unique():
-                        df_p = df_f.loc[df_f.correct_move == typ].copy()
-                        df_p.loc[:, "percent"] = df_f.loc[:, "count"] / df_f.loc[:, "total"]
-                        fig.add_trace(
-                            go.Bar(
-                                x=df_p["date"],
-                                y=df_p[data_col],
-                                marker={"color": COLOR_DICT[typ]},
-                                name=f"{typ}",
-                                hovertemplate=f"%{{y:.4f}} {val}",
-                                legendgroup=f"{typ}",
-                                showlegend=legend_dict_move[typ],
-                            )
-                        )
-                        legend_dict_move[typ] = False
+                    bar = {
+                        "type": "bar",
+                        "x": dates[positions],
+                        "y": values[positions],
+                        "marker": {"color": COLOR_DICT[typ]},
+                        "name": f"{typ}",
+                        "hovertemplate": f"%{{y:.4f}} {val}",
+                        "legendgroup": f"{typ}",
+                        "showlegend": typ not in shown,
+                    }
+                    shown.add(typ)
                 else:
-                    df_f.loc[:, "percent"] = df_f.loc[:, "count"] / df_f.loc[:, "total"]
-                    fig.add_trace(
-                        go.Bar(
-                            x=df_f["date"],
-                            y=df_f[data_col],
-                            name=f"{val}",
-                            hovertemplate="%{y:.4f}",
-                            marker={"color": COLOR_DICT[f"{val}"]},
-                            legendgroup=f"{val}",
-                            showlegend=legend_dict[val],
-                        )
-                    )
-                    legend_dict[val] = False
-            fig_dict[user][mode] = fig
+                    bar = {
+                        "type": "bar",
+                        "x": dates[positions],
+                        "y": values[positions],
+                        "name": f"{val}",
+                        "hovertemplate": "%{y:.4f}",
+                        "marker": {"color": COLOR_DICT[f"{val}"]},
+                        "legendgroup": f"{val}",
+                        "showlegend": True,
+                    }
+                traces[graph].append(bar)
+    fig_dict: dict = {}
+    for user in user_list or ["all user"]:
+        fig_dict[user] = {mode: go.Figure(traces.get((user, mode), [])) for mode in mode_list or ["all_modes"]}
     return fig_dict
 
 
@@ -189,25 +268,29 @@ def main_plot(
     mode_dd: Optional[list] = None,
     move_dd: Optional[list] = None,
     absolute_val_check: bool = True,
+    engine: sa.engine.Engine = engine,
 ) -> dict[str, dict[str, go.Figure]]:
     """Create the plots from the raw data.
 
+    Without data the filtering and aggregation run in the database.
+
     Args:
         data (Optional[list], optional): data to transform and plot. Defaults to None.
         user_dd (Optional[list], optional): individual users. Defaults to None.
         mode_dd (Optional[list], optional): individual modes. Defaults to None.
         move_dd (Optional[list], optional): individual moves. Defaults to None.
         absolute_val_check (bool, optional): plot absolute values?. Defaults to True.
+        engine (sa.engine.Engine, optional): database engine used without data. Defaults to engine.
 
     Returns:
         dict[str, dict[str, go.Figure]]: dict containing the users,modes and graphs.
     """
+    group_list, data_column = set_optional_lists(bool(user_dd), bool(mode_dd), bool(move_dd), absolute_val_check)
     if data:
         dataframe = pd.DataFrame(data).astype(EXT_TABLE_DTYPES)
+        dataframe = filter_data(dataframe, user_dd, mode_dd, move_dd)
+        dataframe = transform_data(dataframe, group_list)
     else:
-        dataframe = get_data()
-    dataframe = filter_data(dataframe, user_dd, mode_dd, move_dd)
-    group_list, data_column = set_optional_lists(bool(user_dd), bool(mode_dd), bool(move_dd), absolute_val_check)
-    dataframe = transform_data(dataframe, group_list)
+        dataframe = read_aggregates(engine, group_list, user_dd, mode_dd, move_dd)
     fig_dict = plot_figure(dataframe, data_column, user_dd, mode_dd, move_dd)
     return fig_dict
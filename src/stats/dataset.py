@@ -0,0 +1,52 @@
+"""This script contains the plot columns of the training data and a cheap version of the stored data."""
+
+from typing import Optional
+
+import pandas as pd
+import sqlalchemy as sa
+
+from src import ensure_schema, training_daily_rollup, training_data
+from src.storage.columnar import AnswerLog
+
+
+def add_plot_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Add the columns used to aggregate the training data.
+
+    Args:
+        dataframe (pd.DataFrame): rows of the training_data table
+
+    Returns:
+        pd.DataFrame: data with date, count and total columns
+    """
+    dataframe["date"] = dataframe["upload_time"].dt.date
+    dataframe["count"] = 1
+    dataframe["total"] = 1
+    return dataframe
+
+
+def dataset_version(store: sa.engine.Engine | AnswerLog) -> Optional[str]:
+    """Identify the current training data without loading it.
+
+    The highest id changes with every insert. The total count of the daily rollup tells apart the same highest id
+    before and after a compaction, it only grows with dated inserts and a compaction does not change it. A database
+    whose raw rows were all compacted still has a version, the dashboard is drawn from its rollup.
+
+    Args:
+        store (sa.engine.Engine | AnswerLog): database engine or columnar answer log
+
+    Returns:
+        Optional[str]: version token, None without raw rows and rollup rows
+    """
+    if isinstance(store, AnswerLog):
+        length = len(store)
+        return str(length) if length else None
+    ensure_schema(store)
+    stmt = sa.select(
+        sa.select(sa.func.max(training_data.c.id)).scalar_subquery(),
+        sa.select(sa.func.coalesce(sa.func.sum(training_daily_rollup.c["count"]), 0)).scalar_subquery(),
+    )
+    with store.begin() as conn:
+        last_id, total = conn.execute(stmt).one()
+    if last_id is None and not total:
+        return None
+    return f"{last_id or 0}.{total}"
@@ -0,0 +1,114 @@
+"""This script contains a bounded least recently used cache of the dashboard figures."""
+
+import collections
+import sys
+import threading
+from typing import Callable, Hashable
+
+import numpy as np
+from plotly import graph_objects as go
+
+FigureDict = dict[str, dict[str, go.Figure]]
+ITEM_BYTES = 8
+
+
+def figure_size(fig_dict: FigureDict) -> int:
+    """Estimate the memory of figures by the size of their x and y arrays.
+
+    Serializing the figures to measure them would take about half as long as building them. Plotly stores strings
+    like the dates in object arrays, these are estimated from the size of their first item.
+
+    Args:
+        fig_dict (FigureDict): figures by user and mode
+
+    Returns:
+        int: approximate size in bytes
+    """
+    size = 0
+    for figures in fig_dict.values():
+        for fig in figures.values():
+            for trace in fig.data:
+                for values in (trace["x"], trace["y"]):
+                    if isinstance(values, np.ndarray):
+                        size += values.nbytes
+                        if values.dtype == object and values.size:
+                            size += values.size * sys.getsizeof(values.flat[0])
+                    elif values is not None:
+                        size += len(values) * ITEM_BYTES
+    return size
+
+
+class FigureCache:
+    """Least recently used cache of built figures.
+
+    The key has to contain the dataset version, so new data is never served from an old entry. The least recently
+    used entries are evicted when there are more than max_entries entries or they exceed max_bytes together.
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 64 * 2**20) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries (int, optional): maximum number of entries. Defaults to 64.
+            max_bytes (int, optional): maximum approximate size of all entries. Defaults to 64 * 2**20.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: collections.OrderedDict[Hashable, tuple[FigureDict, int]] = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, build: Callable[[], FigureDict]) -> FigureDict:
+        """Return the cached figures of a key, or build and cache them.
+
+        Args:
+            key (Hashable): dataset version and plot settings
+            build (Callable[[], FigureDict]): function creating the figures
+
+        Returns:
+            FigureDict: figures by user and mode
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key][0]
+            self.misses += 1
+        fig_dict = build()
+        size = figure_size(fig_dict)
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (fig_dict, size)
+            self.size += size
+            while len(self.entries) > self.max_entries or (self.size > self.max_bytes and len(self.entries) > 1):
+                self.size -= self.entries.popitem(last=False)[1][1]
+                self.evictions += 1
+        return fig_dict
+
+    def clear(self) -> None:
+        """Remove all entries, the counters are kept."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters of the cache.
+
+        Returns:
+            dict[str, int]: hits, misses, evictions, entries and approximate size in bytes
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.size,
+            }
+
+
+FIGURE_CACHE = FigureCache()
@@ -0,0 +1 @@
+"""This module contains the storage of the training answers."""
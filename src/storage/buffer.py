@@ -0,0 +1,221 @@
+"""This script contains a write-behind buffer that saves training answers to the database in batches."""
+
+import atexit
+import datetime
+import logging
+import threading
+import time
+from typing import Optional
+
+import sqlalchemy as sa
+
+from src import engine, ensure_schema, training_data
+from src.basic_strategy.hand import Card, Hand
+from src.storage.columnar import AnswerLog, answer_store
+
+logger = logging.getLogger(__name__)
+INSERT_ANSWER = training_data.insert()
+
+
+def answer_record(user: str, mode: str, guessed_move: str, correct_move: str, hand: Hand, dealer: Card) -> dict:
+    """Create a training_data row for an answer.
+
+    Args:
+        user (str): current user
+        mode (str): training mode
+        guessed_move (str): move chosen by the user
+        correct_move (str): move of the strategy
+        hand (Hand): player hand
+        dealer (Card): dealer upcard
+
+    Returns:
+        dict: row of the training_data table
+    """
+    return {
+        "user": user,
+        "training_type": mode,
+        "was_correct": guessed_move == correct_move,
+        "correct_move": correct_move,
+        "guessed_move": guessed_move,
+        "card1": hand.cards[0].rank,
+        "card2": hand.cards[1].rank,
+        "hand_value": hand.value,
+        "dealer_card": dealer.value,
+        "upload_time": datetime.datetime.now(),
+    }
+
+
+def write_answers(store: sa.engine.Engine | AnswerLog, records: list[dict]) -> None:
+    """Write answer records in one transaction with one executemany of the prepared insert, or append them to the log.
+
+    Args:
+        store (sa.engine.Engine | AnswerLog): database engine or columnar answer log
+        records (list[dict]): rows of the training_data table
+    """
+    if isinstance(store, AnswerLog):
+        store.append(records)
+        return
+    ensure_schema(store)
+    with store.begin() as conn:
+        conn.execute(INSERT_ANSWER, records)
+
+
+class AnswerBuffer:
+    """Queue answer records and write them to the database from a background thread.
+
+    A batch is written when max_rows records are queued or the oldest record waited max_delay seconds.
+    Remaining records are written when the buffer is closed, which happens at interpreter exit.
+
+    A failed write is retried after an exponential backoff between min_backoff and max_backoff seconds. While the
+    store is unavailable at most max_records records are kept, the oldest ones are dropped with a warning.
+    """
+
+    def __init__(
+        self,
+        store: sa.engine.Engine | AnswerLog,
+        max_rows: int = 100,
+        max_delay: float = 2.0,
+        max_records: int = 100_000,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        """Initialize the buffer.
+
+        Args:
+            store (sa.engine.Engine | AnswerLog): database engine or columnar answer log
+            max_rows (int, optional): queued records that trigger a write. Defaults to 100.
+            max_delay (float, optional): seconds a record waits at most before a write. Defaults to 2.0.
+            max_records (int, optional): queued records kept at most. Defaults to 100_000.
+            min_backoff (float, optional): seconds before retrying the first failed write. Defaults to 1.0.
+            max_backoff (float, optional): seconds between retries at most. Defaults to 60.0.
+        """
+        self.store = store
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.max_records = max_records
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.records: list[dict] = []
+        self.oldest = 0.0
+        self.closed = False
+        self.flushes = 0
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.failures = 0
+        self.retry_at = 0.0
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        atexit.register(self.close)
+
+    def add(self, record: dict) -> None:
+        """Queue a record without waiting for the database.
+
+        Args:
+            record (dict): row of the training_data table
+
+        Raises:
+            RuntimeError: the buffer is closed
+        """
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("AnswerBuffer is closed")
+            if not self.records:
+                self.oldest = time.monotonic()
+            self.records.append(record)
+            self.drop_oldest()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="answer-buffer", daemon=True)
+                self.thread.start()
+            if len(self.records) >= self.max_rows:
+                self.condition.notify()
+
+    def drop_oldest(self) -> None:
+        """Drop the oldest queued records beyond max_records, the condition has to be held."""
+        excess = len(self.records) - self.max_records
+        if excess > 0:
+            del self.records[:excess]
+            self.dropped_rows += excess
+            logger.warning("answer buffer is full, dropped the %s oldest answers", excess)
+
+    def backoff(self) -> float:
+        """Compute the delay before the next retry of a failed write.
+
+        Returns:
+            float: seconds, doubled with every consecutive failure up to max_backoff
+        """
+        return min(self.min_backoff * 2 ** max(self.failures - 1, 0), self.max_backoff)
+
+    def due(self) -> bool:
+        """Check if the queued records have to be written.
+
+        Returns:
+            bool: batch full or oldest record waited long enough, and no retry pending?
+        """
+        now = time.monotonic()
+        return (
+            bool(self.records)
+            and now >= self.retry_at
+            and (len(self.records) >= self.max_rows or now >= self.oldest + self.max_delay)
+        )
+
+    def run(self) -> None:
+        """Write batches until the buffer is closed."""
+        while True:
+            with self.condition:
+                while not (self.closed or self.due()):
+                    self.condition.wait(
+                        max(max(self.oldest + self.max_delay, self.retry_at) - time.monotonic(), 0)
+                        if self.records
+                        else None
+                    )
+                if self.closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception(
+                    "writing %s answers failed, retrying in %s seconds", len(self.records), self.backoff()
+                )
+
+    def flush(self) -> int:
+        """Write all queued records at once.
+
+        Records are queued again if the write fails and the next retry is delayed by the backoff.
+
+        Returns:
+            int: number of written records
+        """
+        with self.write_lock:
+            with self.condition:
+                records, self.records = self.records, []
+            if not records:
+                return 0
+            try:
+                write_answers(self.store, records)
+            except Exception:
+                with self.condition:
+                    self.records[:0] = records
+                    self.drop_oldest()
+                    self.oldest = time.monotonic()
+                    self.failures += 1
+                    self.retry_at = self.oldest + self.backoff()
+                raise
+            with self.condition:
+                self.failures = 0
+                self.retry_at = 0.0
+            self.flushes += 1
+            self.written_rows += len(records)
+            return len(records)
+
+    def close(self) -> None:
+        """Stop the background thread and write the remaining records."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.flush()
+
+
+ANSWER_BUFFER = AnswerBuffer(answer_store(engine))
@@ -0,0 +1,315 @@
+"""This script contains an append-only columnar log of training answers read through memory maps.
+
+Every column is a file of fixed width values inside a segment directory. Strings are stored as small integer codes
+of a dictionary kept in dictionary.json, timestamps as nanoseconds since the epoch.
+"""
+
+import functools
+import json
+import os
+import pathlib
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+from src import ANSWER_BACKEND, EXT_TABLE_DTYPES, TABLE_DTYPES
+
+ANSWER_LOG_DIR = pathlib.Path.cwd().resolve() / "db" / "answers"
+COLUMN_TYPES: dict[str, type] = {
+    "user": np.uint16,
+    "training_type": np.uint8,
+    "was_correct": np.bool_,
+    "correct_move": np.uint8,
+    "guessed_move": np.uint8,
+    "card1": np.uint8,
+    "card2": np.uint8,
+    "hand_value": np.int8,
+    "dealer_card": np.int8,
+    "upload_time": np.int64,
+}
+ENCODED_COLUMNS = ["user", "training_type", "correct_move", "guessed_move", "card1", "card2"]
+NS_PER_DAY = 24 * 3600 * 10**9
+MAX_BINCOUNT = 2**26
+
+
+class AnswerLog:
+    """Append-only columnar storage of training answers.
+
+    Rows are addressed by their position in the log, a new segment is started every segment_rows rows.
+    """
+
+    def __init__(self, directory: pathlib.Path, segment_rows: int = 2**20) -> None:
+        """Open or create a log.
+
+        Args:
+            directory (pathlib.Path): directory of the log
+            segment_rows (int, optional): rows per segment. Defaults to 2**20.
+        """
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.lock = threading.RLock()
+        directory.mkdir(parents=True, exist_ok=True)
+        dictionary_file = directory / "dictionary.json"
+        stored = json.loads(dictionary_file.read_text()) if dictionary_file.exists() else {}
+        self.dictionary: dict[str, list[str]] = {column: stored.get(column, []) for column in ENCODED_COLUMNS}
+
+    def segment_dirs(self) -> list[pathlib.Path]:
+        """Return the segment directories in order.
+
+        Returns:
+            list[pathlib.Path]: segment directories
+        """
+        return sorted(self.directory.glob("segment_*"))
+
+    @staticmethod
+    def segment_length(segment: pathlib.Path) -> int:
+        """Count the complete rows of a segment, a partly written row is ignored.
+
+        Args:
+            segment (pathlib.Path): segment directory
+
+        Returns:
+            int: number of rows
+        """
+        sizes = []
+        for column, dtype in COLUMN_TYPES.items():
+            path = segment / f"{column}.bin"
+            sizes.append(path.stat().st_size // np.dtype(dtype).itemsize if path.exists() else 0)
+        return min(sizes)
+
+    def __len__(self) -> int:
+        """Count the rows in the log.
+
+        Returns:
+            int: number of rows
+        """
+        return sum(self.segment_length(segment) for segment in self.segment_dirs())
+
+    def encode(self, column: str, values: pd.Series) -> np.ndarray:
+        """Convert strings to dictionary codes, unknown strings are added to the dictionary.
+
+        Args:
+            column (str): encoded column
+            values (pd.Series): strings, missing values are stored as ""
+
+        Raises:
+            ValueError: the dictionary outgrew the code type
+
+        Returns:
+            np.ndarray: codes
+        """
+        values = values.fillna("").astype(str)
+        categories = self.dictionary[column]
+        known = set(categories)
+        categories.extend(value for value in values.unique() if value not in known)
+        if len(categories) > np.iinfo(COLUMN_TYPES[column]).max + 1:
+            raise ValueError(f"too many distinct values in column '{column}'")
+        return pd.Categorical(values, categories=categories).codes.astype(COLUMN_TYPES[column])
+
+    def append(self, records: list[dict] | pd.DataFrame) -> int:
+        """Append answers to the log.
+
+        The column files of the last segment are cut to its complete rows first, so the leftovers of an interrupted
+        append never shift the new rows of a column.
+
+        Args:
+            records (list[dict] | pd.DataFrame): rows with the training_data columns
+
+        Returns:
+            int: number of appended rows
+        """
+        dataframe = pd.DataFrame.from_records(records) if isinstance(records, list) else records
+        if dataframe.empty:
+            return 0
+        with self.lock:
+            arrays = {
+                column: (
+                    self.encode(column, dataframe[column])
+                    if column in ENCODED_COLUMNS
+                    else np.asarray(dataframe[column].fillna(0), dtype=COLUMN_TYPES[column])
+                )
+                for column in COLUMN_TYPES
+                if column != "upload_time"
+            }
+            arrays["upload_time"] = pd.to_datetime(dataframe["upload_time"]).to_numpy("datetime64[ns]").view(np.int64)
+            dictionary_file = self.directory / "dictionary.json"
+            dictionary_file.with_suffix(".tmp").write_text(json.dumps(self.dictionary))
+            os.replace(dictionary_file.with_suffix(".tmp"), dictionary_file)
+            segments = self.segment_dirs()
+            written = 0
+            while written < len(dataframe):
+                length = self.segment_length(segments[-1]) if segments else self.segment_rows
+                if length >= self.segment_rows:
+                    segments.append(self.directory / f"segment_{len(segments):06d}")
+                    segments[-1].mkdir()
+                    length = 0
+                end = min(len(dataframe), written + self.segment_rows - length)
+                for column, array in arrays.items():
+                    with open(segments[-1] / f"{column}.bin", "ab") as file:
+                        file.truncate(length * array.itemsize)
+                        file.write(array[written:end].tobytes())
+                written = end
+        return written
+
+    def columns(self, start: int = 0, stop: Optional[int] = None) -> dict[str, np.ndarray]:
+        """Map the columns of a range of rows.
+
+        A single segment is returned without copying, multiple segments are concatenated.
+
+        Args:
+            start (int, optional): first row. Defaults to 0.
+            stop (Optional[int], optional): row after the last row, all rows if None. Defaults to None.
+
+        Returns:
+            dict[str, np.ndarray]: codes and values per column
+        """
+        parts: dict[str, list[np.ndarray]] = {column: [] for column in COLUMN_TYPES}
+        offset = 0
+        for segment in self.segment_dirs():
+            if stop is not None and offset >= stop:
+                break
+            length = self.segment_length(segment)
+            if offset + length > start and length:
+                first = max(start - offset, 0)
+                last = length if stop is None else min(stop - offset, length)
+                for column, dtype in COLUMN_TYPES.items():
+                    mapped = np.memmap(segment / f"{column}.bin", dtype=dtype, mode="r", shape=(length,))
+                    parts[column].append(mapped[first:last])
+            offset += length
+        return {
+            column: (arrays[0] if len(arrays) == 1 else np.concatenate(arrays) if arrays else np.empty(0, dtype))
+            for (column, arrays), dtype in zip(parts.items(), COLUMN_TYPES.values())
+        }
+
+    def decode(self, column: str, codes: np.ndarray) -> pd.Series:
+        """Convert dictionary codes to strings.
+
+        Args:
+            column (str): encoded column
+            codes (np.ndarray): codes
+
+        Returns:
+            pd.Series: strings
+        """
+        return pd.Series(np.asarray(self.dictionary[column], dtype=object)[codes], dtype=pd.StringDtype())
+
+    def frame(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """Decode a range of rows.
+
+        Args:
+            start (int, optional): first row. Defaults to 0.
+            stop (Optional[int], optional): row after the last row, all rows if None. Defaults to None.
+
+        Returns:
+            pd.DataFrame: rows with the training_data columns, indexed by their position in the log
+        """
+        columns = self.columns(start, stop)
+        dataframe = pd.DataFrame(
+            {
+                column: (
+                    self.decode(column, values)
+                    if column in ENCODED_COLUMNS
+                    else pd.Series(values.view("datetime64[ns]") if column == "upload_time" else values)
+                )
+                for column, values in columns.items()
+            }
+        ).astype(TABLE_DTYPES)
+        dataframe.index = pd.RangeIndex(start, start + len(dataframe), name="id")
+        return dataframe
+
+    def aggregate(
+        self,
+        group_list: list,
+        user_list: Optional[list] = None,
+        mode_list: Optional[list] = None,
+        move_list: Optional[list] = None,
+    ) -> pd.DataFrame:
+        """Filter and aggregate the answers on the codes like create_plots.read_aggregates.
+
+        The group columns are combined to one integer key that is counted with np.bincount.
+
+        Args:
+            group_list (list): columns to aggregate on, starting with date
+            user_list (Optional[list], optional): user to filter on. Defaults to None.
+            mode_list (Optional[list], optional): modes to filter on. Defaults to None.
+            move_list (Optional[list], optional): moves to filter on. Defaults to None.
+
+        Returns:
+            pd.DataFrame: aggregated data
+        """
+        columns = self.columns()
+        masks = [
+            self.member_mask(column, values, columns[column])
+            for column, values in (("user", user_list), ("training_type", mode_list))
+            if values
+        ]
+        if move_list:
+            masks.append(
+                self.member_mask("correct_move", move_list, columns["correct_move"])
+                | self.member_mask("guessed_move", move_list, columns["guessed_move"])
+            )
+        if masks:
+            mask = np.logical_and.reduce(masks)
+            columns = {column: columns[column][mask] for column in group_list[1:] + ["upload_time", "was_correct"]}
+        days = columns["upload_time"] // NS_PER_DAY
+        first_day = int(days.min()) if len(days) else 0
+        keys = [days - first_day] + [columns[column] for column in group_list[1:]] + [columns["was_correct"]]
+        radices = [int(keys[0].max()) + 1 if len(days) else 1]
+        radices += [max(len(self.dictionary[column]), 1) for column in group_list[1:]] + [2]
+        key = np.ravel_multi_index(keys, radices)
+        if np.prod(radices) <= MAX_BINCOUNT:
+            counts = np.bincount(key, minlength=int(np.prod(radices)))
+            combined = np.flatnonzero(counts)
+            counts = counts[combined]
+        else:
+            combined, counts = np.unique(key, return_counts=True)
+        groups = np.unravel_index(combined, radices)
+        dataframe = pd.DataFrame({"date": ((groups[0] + first_day) * NS_PER_DAY).view("datetime64[ns]")})
+        for column, codes in zip(group_list[1:], groups[1:-1]):
+            dataframe[column] = self.decode(column, codes)
+        dataframe["was_correct"] = groups[-1].astype(bool)
+        dataframe["count"] = counts
+        dataframe["total"] = dataframe.groupby(group_list)["count"].transform("sum")
+        dataframe = dataframe.sort_values(group_list + ["was_correct"], ignore_index=True)
+        return dataframe.astype({column: EXT_TABLE_DTYPES[column] for column in dataframe})
+
+    def member_mask(self, column: str, values: list, codes: np.ndarray) -> np.ndarray:
+        """Check which codes belong to the given strings through a lookup table indexed by code.
+
+        Args:
+            column (str): encoded column
+            values (list): strings to keep
+            codes (np.ndarray): codes of the column
+
+        Returns:
+            np.ndarray: mask of the rows holding one of the strings
+        """
+        categories = self.dictionary[column]
+        table = np.zeros(max(len(categories), 1), dtype=bool)
+        table[[categories.index(value) for value in values if value in categories]] = True
+        return table[codes]
+
+
+@functools.cache
+def default_answer_log() -> AnswerLog:
+    """Open the answer log in the db folder on first use.
+
+    Returns:
+        AnswerLog: shared answer log
+    """
+    return AnswerLog(ANSWER_LOG_DIR)
+
+
+def answer_store(engine: sa.engine.Engine) -> sa.engine.Engine | AnswerLog:
+    """Return the storage selected by BLACKJACK_ANSWER_BACKEND.
+
+    Args:
+        engine (sa.engine.Engine): database engine used by the sql backend
+
+    Returns:
+        sa.engine.Engine | AnswerLog: engine for "sql", the default answer log for "columnar"
+    """
+    return default_answer_log() if ANSWER_BACKEND == "columnar" else engine
@@ -0,0 +1,257 @@
+"""This script contains the database engine, the declared tables and the schema migration."""
+
+import functools
+import os
+import pathlib
+import weakref
+
+import pandas as pd
+import sqlalchemy as sa
+
+db_file = pathlib.Path.cwd().resolve() / "db" / "db.sqlite"
+DB_URL = os.environ.get("BLACKJACK_DB_URL", f"sqlite:///{db_file}")
+ANSWER_BACKEND = os.environ.get("BLACKJACK_ANSWER_BACKEND", "sql")
+BUSY_TIMEOUT_MS = 5000
+SQLITE_PRAGMAS: dict[str, str | int] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": BUSY_TIMEOUT_MS,
+    "mmap_size": 2**28,
+    "cache_size": -(2**16),
+    "temp_store": "MEMORY",
+}
+
+
+def set_sqlite_pragmas(dbapi_connection: object, _: object) -> None:
+    """Configure a new sqlite connection.
+
+    WAL lets readers work alongside the single writer, busy_timeout makes a blocked writer wait instead of failing.
+
+    Args:
+        dbapi_connection (object): new sqlite3 connection
+        _ (object): connection pool record
+    """
+    cursor = dbapi_connection.cursor()  # type:ignore[attr-defined]
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def create_engine(url: str = DB_URL, pool_size: int = 5, max_overflow: int = 10) -> sa.engine.Engine:
+    """Create a database engine, sqlite file databases are tuned for concurrent dashboard reads and answer writes.
+
+    Args:
+        url (str, optional): database url. Defaults to DB_URL.
+        pool_size (int, optional): connections kept open. Defaults to 5.
+        max_overflow (int, optional): additional connections under load. Defaults to 10.
+
+    Raises:
+        ValueError: the url is not a sqlite database, the schema uses sqlite specific sql
+
+    Returns:
+        sa.engine.Engine: database engine
+    """
+    database_url = sa.make_url(url)
+    if database_url.get_backend_name() != "sqlite":
+        raise ValueError(f"only sqlite databases are supported, got '{database_url.get_backend_name()}'")
+    if database_url.database in (None, "", ":memory:"):
+        return sa.create_engine(url)
+    pathlib.Path(database_url.database).parent.mkdir(parents=True, exist_ok=True)
+    engine = sa.create_engine(
+        url,
+        poolclass=sa.QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=30,
+        connect_args={"check_same_thread": False, "timeout": BUSY_TIMEOUT_MS / 1000},
+    )
+    sa.event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+@functools.cache
+def default_engine() -> sa.engine.Engine:
+    """Create the engine of the configured database on first use.
+
+    Returns:
+        sa.engine.Engine: shared database engine
+    """
+    return create_engine()
+
+
+TABLE_DTYPES = {
+    "user": pd.StringDtype(),
+    "training_type": pd.StringDtype(),
+    "was_correct": pd.BooleanDtype(),
+    "correct_move": pd.StringDtype(),
+    "guessed_move": pd.StringDtype(),
+    "card1": pd.StringDtype(),
+    "card2": pd.StringDtype(),
+    "hand_value": pd.Int16Dtype(),
+    "dealer_card": pd.Int16Dtype(),
+    "upload_time": "datetime64[ns]",
+}
+
+EXT_TABLE_DTYPES = {**TABLE_DTYPES, "date": "datetime64[ns]", "count": pd.Int32Dtype(), "total": pd.Int32Dtype()}
+
+metadata = sa.MetaData()
+training_data = sa.Table(
+    "training_data",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+    sa.Column("user", sa.String),
+    sa.Column("training_type", sa.String),
+    sa.Column("was_correct", sa.Boolean),
+    sa.Column("correct_move", sa.String),
+    sa.Column("guessed_move", sa.String),
+    sa.Column("card1", sa.String(1)),
+    sa.Column("card2", sa.String(1)),
+    sa.Column("hand_value", sa.SmallInteger),
+    sa.Column("dealer_card", sa.SmallInteger),
+    sa.Column("upload_time", sa.DateTime),
+    sa.Index("ix_training_data_user_time", "user", "upload_time"),
+    sa.Index("ix_training_data_type_time", "training_type", "upload_time"),
+)
+ROLLUP_KEYS = ["user", "training_type", "correct_move", "guessed_move", "was_correct"]
+training_daily_rollup = sa.Table(
+    "training_daily_rollup",
+    metadata,
+    sa.Column("date", sa.Date, primary_key=True),
+    *[sa.Column(key, training_data.c[key].type, primary_key=True) for key in ROLLUP_KEYS],
+    sa.Column("count", sa.Integer, nullable=False),
+)
+ROLLUP_VALUES = ", ".join(
+    ["date({row}upload_time)"]
+    + [f"COALESCE({{row}}{key}, {0 if key == 'was_correct' else repr('')})" for key in ROLLUP_KEYS]
+)
+ROLLUP_COLUMNS = ", ".join(["date"] + ROLLUP_KEYS)
+ROLLUP_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS training_data_rollup AFTER INSERT ON training_data
+WHEN NEW.upload_time IS NOT NULL
+BEGIN
+    INSERT INTO training_daily_rollup ({ROLLUP_COLUMNS}, count) VALUES ({ROLLUP_VALUES.format(row="NEW.")}, 1)
+    ON CONFLICT ({ROLLUP_COLUMNS}) DO UPDATE SET count = count + 1;
+END"""
+DISTINCT_COLUMNS = ["user", "training_type"]
+training_distinct_values = sa.Table(
+    "training_distinct_values",
+    metadata,
+    sa.Column("field", sa.String, primary_key=True),
+    sa.Column("value", sa.String, primary_key=True),
+)
+DISTINCT_INSERTS = "".join(
+    f"    INSERT OR IGNORE INTO training_distinct_values (field, value) "
+    f"SELECT '{column}', NEW.{column} WHERE NEW.{column} IS NOT NULL;\n"
+    for column in DISTINCT_COLUMNS
+)
+DISTINCT_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS training_data_distinct AFTER INSERT ON training_data
+BEGIN
+{DISTINCT_INSERTS}END"""
+SCHEMA_ENGINES: weakref.WeakSet = weakref.WeakSet()
+
+
+def migrate_training_data(conn: sa.Connection) -> None:
+    """Copy a training_data table created by DataFrame.to_sql into the declared table.
+
+    The pandas index becomes the id if it is unique, otherwise the rows are numbered in insertion order.
+    The old table is only dropped after all rows are copied.
+
+    Args:
+        conn (sa.Connection): open database connection
+    """
+    legacy_columns = {column["name"] for column in sa.inspect(conn).get_columns("training_data")}
+    unique_index = (
+        "index" in legacy_columns
+        and conn.execute(sa.text('SELECT COUNT(DISTINCT "index") = COUNT(*) FROM training_data')).scalar()
+    )
+    migration = training_data.to_metadata(sa.MetaData(), name="training_data_migration")
+    migration.drop(conn, checkfirst=True)
+    migration.create(conn)
+    columns = ", ".join(f'"{name}"' for name in TABLE_DTYPES)
+    key = '"index"' if unique_index else "rowid"
+    conn.execute(
+        sa.text(f"INSERT INTO training_data_migration (id, {columns}) SELECT {key}, {columns} FROM training_data")
+    )
+    conn.execute(sa.text("DROP TABLE training_data"))
+    conn.execute(sa.text("ALTER TABLE training_data_migration RENAME TO training_data"))
+
+
+def rebuild_rollup(conn: sa.Connection) -> int:
+    """Recount the daily rollup for every date that has rows in training_data.
+
+    Dates without raw rows, for example after a compaction, keep their rollup rows.
+
+    Args:
+        conn (sa.Connection): open database connection
+
+    Returns:
+        int: number of rollup rows written
+    """
+    conn.execute(
+        sa.text(
+            "DELETE FROM training_daily_rollup "
+            "WHERE date IN (SELECT DISTINCT date(upload_time) FROM training_data WHERE upload_time IS NOT NULL)"
+        )
+    )
+    values = ROLLUP_VALUES.format(row="")
+    return conn.execute(
+        sa.text(
+            f"INSERT INTO training_daily_rollup ({ROLLUP_COLUMNS}, count) "
+            f"SELECT {values}, COUNT(*) FROM training_data WHERE upload_time IS NOT NULL GROUP BY {values}"
+        )
+    ).rowcount
+
+
+def rebuild_distinct_values(conn: sa.Connection) -> int:
+    """Add the distinct users and training types of training_data and the daily rollup to the distinct values.
+
+    The rollup keeps the values of compacted rows.
+
+    Args:
+        conn (sa.Connection): open database connection
+
+    Returns:
+        int: number of added values
+    """
+    added = 0
+    for column in DISTINCT_COLUMNS:
+        added += conn.execute(
+            sa.text(
+                f"INSERT OR IGNORE INTO training_distinct_values (field, value) "
+                f"SELECT DISTINCT '{column}', {column} FROM training_data WHERE {column} IS NOT NULL "
+                f"UNION SELECT DISTINCT '{column}', {column} FROM training_daily_rollup WHERE {column} != ''"
+            )
+        ).rowcount
+    return added
+
+
+def ensure_schema(engine: sa.engine.Engine) -> None:
+    """Create or migrate the declared tables once per engine.
+
+    Triggers keep the daily rollup and the distinct values up to date, new tables are filled from the existing rows.
+
+    Args:
+        engine (sa.engine.Engine): database engine
+
+    Raises:
+        ValueError: the engine is not a sqlite engine, the triggers and upserts are sqlite specific sql
+    """
+    if engine in SCHEMA_ENGINES:
+        return
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"only sqlite databases are supported, got '{engine.dialect.name}'")
+    with engine.begin() as conn:
+        inspector = sa.inspect(conn)
+        if inspector.has_table("training_data") and "id" not in {
+            column["name"] for column in inspector.get_columns("training_data")
+        }:
+            migrate_training_data(conn)
+        new_rollup = not inspector.has_table("training_daily_rollup")
+        new_distinct_values = not inspector.has_table("training_distinct_values")
+        metadata.create_all(conn)
+        conn.execute(sa.text(ROLLUP_TRIGGER))
+        conn.execute(sa.text(DISTINCT_TRIGGER))
+        if new_rollup:
+            rebuild_rollup(conn)
+        if new_distinct_values:
+            rebuild_distinct_values(conn)
+    SCHEMA_ENGINES.add(engine)
@@ -0,0 +1 @@
+"""This module contains maintenance commands for the training database."""
@@ -0,0 +1,92 @@
+"""Fold raw training answers older than a retention age into the daily rollup and shrink the database."""
+
+import argparse
+import datetime
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import sqlalchemy as sa
+
+from src import DB_URL, create_engine, ensure_schema, training_data
+
+logger = logging.getLogger(__name__)
+RETENTION_DAYS = int(os.environ.get("BLACKJACK_RETENTION_DAYS", "0"))
+
+
+def compact(engine: sa.engine.Engine, days: int, vacuum: bool = True, today: Optional[datetime.date] = None) -> int:
+    """Delete raw answers of complete days older than the retention age.
+
+    Every inserted answer is already counted in the daily rollup by a trigger, so the rollup is not recounted. A
+    recount would lose the totals of compacted days that got new raw rows, for example from an import. The
+    dashboard plots from the rollup, so its statistics do not change. Only the per answer details like the cards
+    are lost. The columnar answer log is append-only and not compacted.
+
+    Args:
+        engine (sa.engine.Engine): database engine
+        days (int): days of raw answers to keep, today included
+        vacuum (bool, optional): release the free pages with VACUUM? Defaults to True.
+        today (Optional[datetime.date], optional): current date. Defaults to None.
+
+    Returns:
+        int: number of deleted rows
+    """
+    ensure_schema(engine)
+    cutoff = datetime.datetime.combine(
+        (today or datetime.date.today()) - datetime.timedelta(days=days - 1), datetime.time()
+    )
+    with engine.begin() as conn:
+        deleted = conn.execute(sa.delete(training_data).where(training_data.c.upload_time < cutoff)).rowcount
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if vacuum and deleted:
+            conn.exec_driver_sql("VACUUM")
+        conn.exec_driver_sql("ANALYZE")
+    return deleted
+
+
+def schedule_compaction(
+    engine: sa.engine.Engine, days: int = RETENTION_DAYS, hours: float = 24.0
+) -> Optional[threading.Event]:
+    """Compact the database now and then periodically in a background thread.
+
+    Args:
+        engine (sa.engine.Engine): database engine
+        days (int, optional): days of raw answers to keep, no compaction if 0. Defaults to RETENTION_DAYS.
+        hours (float, optional): hours between compactions. Defaults to 24.0.
+
+    Returns:
+        Optional[threading.Event]: event stopping the schedule, None if no compaction is configured
+    """
+    if days <= 0:
+        return None
+    stop = threading.Event()
+
+    def run() -> None:
+        while not stop.is_set():
+            try:
+                logger.info("compaction deleted %s rows", compact(engine, days))
+            except Exception:
+                logger.exception("compaction failed")
+            stop.wait(hours * 3600)
+
+    threading.Thread(target=run, name="compaction", daemon=True).start()
+    return stop
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS or 90, help="days of raw answers to keep")
+    parser.add_argument("--url", default=DB_URL, help="database url")
+    parser.add_argument("--no-vacuum", action="store_true", help="skip VACUUM")
+    parser.add_argument("--every", type=float, default=None, help="repeat every given number of hours")
+    args = parser.parse_args()
+    engine = create_engine(args.url)
+    while True:
+        start = time.perf_counter()
+        deleted = compact(engine, args.days, not args.no_vacuum)
+        print(f"deleted {deleted:,} raw rows older than {args.days} days in {time.perf_counter() - start:.2f}s")
+        if args.every is None:
+            break
+        time.sleep(args.every * 3600)
@@ -0,0 +1,158 @@
+"""Export the training data to csv or jsonl files and import such files, streaming in chunks of fixed size."""
+
+import argparse
+import pathlib
+import sys
+import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+from src import DB_URL, TABLE_DTYPES, create_engine, ensure_schema, training_data
+from src.storage.columnar import AnswerLog, answer_store
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl"}
+
+
+def file_format(path: pathlib.Path) -> str:
+    """Derive the file format from the file suffix.
+
+    Args:
+        path (pathlib.Path): data file
+
+    Raises:
+        ValueError: unknown suffix
+
+    Returns:
+        str: "csv" or "jsonl"
+    """
+    try:
+        return FORMATS[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"'{path.suffix}' is not a supported file type, use .csv or .jsonl") from None
+
+
+def report(action: str, rows: int, start: float) -> None:
+    """Print the progress of a transfer.
+
+    Args:
+        action (str): "exported" or "imported"
+        rows (int): rows transferred so far
+        start (float): perf_counter at the start of the transfer
+    """
+    seconds = max(time.perf_counter() - start, 1e-9)
+    print(f"\r{action} {rows:,} rows ({rows / seconds:,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+
+
+def read_chunks(store: sa.engine.Engine | AnswerLog, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Read the training data in chunks without the id column.
+
+    Args:
+        store (sa.engine.Engine | AnswerLog): database engine or columnar answer log
+        chunksize (int): rows per chunk
+
+    Yields:
+        pd.DataFrame: rows of the training_data table
+    """
+    if isinstance(store, AnswerLog):
+        for start in range(0, len(store), chunksize):
+            yield store.frame(start, start + chunksize).reset_index(drop=True)
+        return
+    ensure_schema(store)
+    stmt = sa.select(*[training_data.c[column] for column in TABLE_DTYPES]).order_by(training_data.c.id)
+    with store.connect() as conn:
+        yield from pd.read_sql(
+            stmt, conn.execution_options(stream_results=True), chunksize=chunksize, dtype=TABLE_DTYPES
+        )
+
+
+def export_data(store: sa.engine.Engine | AnswerLog, path: pathlib.Path, chunksize: int = 50_000) -> int:
+    """Write the training data to a file chunk by chunk.
+
+    Args:
+        store (sa.engine.Engine | AnswerLog): database engine or columnar answer log
+        path (pathlib.Path): csv or jsonl file, replaced if it exists
+        chunksize (int, optional): rows read and written at once. Defaults to 50_000.
+
+    Returns:
+        int: number of exported rows
+    """
+    fmt, rows, start = file_format(path), 0, time.perf_counter()
+    with open(path, "w", newline="") as file:
+        for chunk in read_chunks(store, chunksize):
+            if fmt == "csv":
+                chunk.to_csv(file, header=rows == 0, index=False, date_format="%Y-%m-%d %H:%M:%S.%f")
+            else:
+                chunk.to_json(file, orient="records", lines=True, date_format="iso", date_unit="us")
+            rows += len(chunk)
+            report("exported", rows, start)
+    print(file=sys.stderr)
+    return rows
+
+
+def import_data(store: sa.engine.Engine | AnswerLog, path: pathlib.Path, chunksize: int = 50_000) -> int:
+    """Append the rows of a file to the training data, every chunk is written with one executemany in one transaction.
+
+    Args:
+        store (sa.engine.Engine | AnswerLog): database engine or columnar answer log
+        path (pathlib.Path): csv or jsonl file
+        chunksize (int, optional): rows read and written at once. Defaults to 50_000.
+
+    Returns:
+        int: number of imported rows
+    """
+    if file_format(path) == "csv":
+        dtypes = {column: dtype for column, dtype in TABLE_DTYPES.items() if column != "upload_time"}
+        chunks = pd.read_csv(path, chunksize=chunksize, dtype=dtypes, parse_dates=["upload_time"])
+    else:
+        chunks = pd.read_json(path, lines=True, chunksize=chunksize, dtype=False, convert_dates=False)
+    rows, start = 0, time.perf_counter()
+    if not isinstance(store, AnswerLog):
+        ensure_schema(store)
+    with chunks:
+        for chunk in chunks:
+            chunk = chunk.astype(TABLE_DTYPES)
+            if isinstance(store, AnswerLog):
+                store.append(chunk)
+            else:
+                with store.begin() as conn:
+                    insert = training_data.insert().compile(dialect=conn.dialect, column_keys=list(TABLE_DTYPES))
+                    conn.exec_driver_sql(str(insert), insert_rows(chunk))
+            rows += len(chunk)
+            report("imported", rows, start)
+    print(file=sys.stderr)
+    return rows
+
+
+def insert_rows(chunk: pd.DataFrame) -> list[tuple]:
+    """Convert a chunk to parameter tuples for the database driver.
+
+    Timestamps are formatted like sqlalchemy stores them in sqlite, missing values become None.
+
+    Args:
+        chunk (pd.DataFrame): rows of the training_data table
+
+    Returns:
+        list[tuple]: one tuple per row in column order
+    """
+    times = np.datetime_as_string(chunk["upload_time"].to_numpy("datetime64[us]"), unit="us")
+    times.view(np.uint32).reshape(len(times), -1)[:, 10] = ord(" ")
+    values = chunk.astype(object).where(chunk.notna(), None)
+    values["upload_time"] = np.where(chunk["upload_time"].isna(), None, times.astype(object))
+    return list(values.itertuples(index=False, name=None))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("file", type=pathlib.Path, help=".csv or .jsonl file")
+    parser.add_argument("--url", default=DB_URL, help="database url")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args()
+    store = answer_store(create_engine(args.url))
+    if args.command == "export":
+        print(f"exported {export_data(store, args.file, args.chunksize):,} rows to {args.file}")
+    else:
+        print(f"imported {import_data(store, args.file, args.chunksize):,} rows from {args.file}")
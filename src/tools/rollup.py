@@ -0,0 +1,31 @@
+"""Rebuild the daily rollup of the training data for all dates that still have raw rows."""
+
+import argparse
+import time
+
+import sqlalchemy as sa
+
+from src import DB_URL, create_engine, ensure_schema, rebuild_rollup
+
+
+def backfill(engine: sa.engine.Engine) -> int:
+    """Recount the daily rollup from the raw training data.
+
+    Args:
+        engine (sa.engine.Engine): database engine
+
+    Returns:
+        int: number of rollup rows written
+    """
+    ensure_schema(engine)
+    with engine.begin() as conn:
+        return rebuild_rollup(conn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=DB_URL, help="database url")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    rows = backfill(create_engine(args.url))
+    print(f"wrote {rows:,} rollup rows in {time.perf_counter() - start:.2f}s")
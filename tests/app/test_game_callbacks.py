@@ -1,5 +1,6 @@
 """Test game callback funtionality."""
 
+import dataclasses
 from collections import Counter
 from contextvars import copy_context
 
@@ -8,11 +9,14 @@ from dash._callback_context import context_value
 
 from src.app import game_callbacks as gc
 from src.basic_strategy.card_eval import card_eval
-from src.basic_strategy.hand import Hand
+from src.basic_strategy.counting import HI_LO, count_eval, true_count
+from src.basic_strategy.hand import Card, Hand
+from src.basic_strategy.rules import Rules
+from src.basic_strategy.strategy_gen import strategy_table
 
 
 @pytest.mark.parametrize("n_clicks", list(range(0, 10**4, 10**3)))
-@pytest.mark.parametrize("mode", ["split", "soft", "hard", "basic"])
+@pytest.mark.parametrize("mode", ["split", "soft", "hard", "basic", "count"])
 @pytest.mark.parametrize(
     "card_data",
     [[], [{"owner": 0, "hands": "Kc9h", "face_up": "10"}, {"owner": 1, "hands": "4sJc", "face_up": "11"}]],
@@ -48,3 +52,41 @@ def test_cb_eval_action(btn_id: str, mode: str, dealer: dict, player: dict) -> N
     dealer_hand = Hand.from_string(**dealer)
     res = card_eval(hand, dealer_hand.cards[0], mode)
     assert f"({res})" in output[0].children[0]
+
+
+@pytest.mark.parametrize("rules", [Rules(), Rules(hit_soft_17=True, late_surrender=False)])
+def test_cb_eval_action_rules(rules: Rules) -> None:
+    def run_callback() -> list:
+        context_value.set({"triggered_inputs": [{"prop_id": "h.n_clicks"}]})
+        return gc.eval_action(
+            [],
+            1,
+            [{"owner": 0, "hands": "AcTh", "face_up": "10"}, {"owner": 1, "hands": "Ts6h", "face_up": "11"}],
+            "test_user",
+            "basic",
+            dataclasses.asdict(rules),
+        )
+
+    output = copy_context().run(run_callback)
+    res = card_eval(Hand.from_string("Ts6h"), Card("c", "A"), "basic", strategy_table(rules))
+    assert f"({res})" in output[0].children[0]
+
+
+def test_cb_count_mode() -> None:
+    gc.COUNT_SHOES.pop("count_user", None)
+    _, data = gc.deal_and_save_cards(1, "count", [], "count_user")
+    shoe = gc.COUNT_SHOES["count_user"]
+    hole = Hand.from_string(data[0]["hands"]).cards[1]
+    assert data[0]["running_count"] == shoe.running_count - HI_LO[hole.code]
+    assert data[1]["cards_left"] == shoe.cards_left + 1 == 6 * 52 - 3
+    _, data = gc.deal_and_save_cards(2, "count", data, "count_user")
+    assert gc.COUNT_SHOES["count_user"] is shoe and shoe.cards_left == 6 * 52 - 8
+
+    def run_callback() -> list:
+        context_value.set({"triggered_inputs": [{"prop_id": "s.n_clicks"}]})
+        return gc.eval_action([], 1, data, "count_user", "count")
+
+    output = copy_context().run(run_callback)
+    player, dealer = Hand.from_string(data[1]["hands"]), Hand.from_string(data[0]["hands"])
+    res = count_eval(player, dealer.cards[0], "basic", true_count(data[0]["running_count"], data[0]["cards_left"]))
+    assert f"({res})" in output[0].children[0]
@@ -0,0 +1,79 @@
+"""Test the callback metrics."""
+
+import flask
+import pytest
+import sqlalchemy as sa
+
+from src.app import metrics
+
+COUNT_QUERY = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 10000) SELECT COUNT(*) FROM n"
+
+
+def test_histogram_lines() -> None:
+    histogram = metrics.Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.lines("latency", 'callback="cb"') == [
+        'latency_bucket{callback="cb",le="0.1"} 2',
+        'latency_bucket{callback="cb",le="1.0"} 3',
+        'latency_bucket{callback="cb",le="+Inf"} 4',
+        'latency_sum{callback="cb"} 2.65',
+        'latency_count{callback="cb"} 4',
+    ]
+
+
+def test_instrument_records_callback(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(metrics, "METRICS", metrics.CallbackMetrics())
+    engine = sa.create_engine("sqlite://")
+
+    @metrics.instrument
+    def query(value: str, engine: sa.engine.Engine = engine) -> tuple[str, list]:
+        with engine.begin() as conn:
+            conn.execute(sa.text(COUNT_QUERY)).scalar()
+        return value, [value] * 2
+
+    assert query("abc", engine) == ("abc", ["abc", "abc"])
+    histograms = metrics.METRICS.histograms
+    assert histograms[("blackjack_callback_request_bytes", "query")].sum == len('["abc"]')
+    assert histograms[("blackjack_callback_response_bytes", "query")].sum == len('["abc",["abc","abc"]]')
+    db_time = histograms[("blackjack_callback_db_seconds", "query")].sum
+    assert 0 < db_time <= histograms[("blackjack_callback_seconds", "query")].sum
+    assert metrics.QUERY_TIME.seconds is None
+
+
+def test_instrument_samples_payloads(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(metrics, "METRICS", metrics.CallbackMetrics())
+    monkeypatch.setattr(metrics, "PAYLOAD_SAMPLE_EVERY", 3)
+    echo = metrics.instrument(lambda value: value)
+    for i in range(7):
+        echo(i)
+    histograms = metrics.METRICS.histograms
+    assert sum(histograms[("blackjack_callback_seconds", "<lambda>")].counts) == 7
+    assert sum(histograms[("blackjack_callback_request_bytes", "<lambda>")].counts) == 3
+    assert histograms[("blackjack_callback_response_bytes", "<lambda>")].sum == len("[0][3][6]")
+
+
+def test_instrument_records_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(metrics, "METRICS", metrics.CallbackMetrics())
+
+    @metrics.instrument
+    def fail() -> None:
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        fail()
+    assert sum(metrics.METRICS.histograms[("blackjack_callback_seconds", "fail")].counts) == 1
+    assert ("blackjack_callback_response_bytes", "fail") not in metrics.METRICS.histograms
+
+
+def test_metrics_route(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(metrics, "METRICS", metrics.CallbackMetrics())
+    metrics.instrument(lambda: None)()
+    server = flask.Flask(__name__)
+    server.add_url_rule("/metrics", "metrics", metrics.metrics_response)
+    response = server.test_client().get("/metrics")
+    text = response.get_data(as_text=True)
+    assert response.content_type == metrics.CONTENT_TYPE
+    assert "# TYPE blackjack_callback_seconds histogram" in text
+    assert 'blackjack_callback_seconds_count{callback="<lambda>"} 1' in text
+    assert "# TYPE blackjack_figure_cache_hits_total counter" in text
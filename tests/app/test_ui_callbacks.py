@@ -1,13 +1,13 @@
 import datetime
-from collections import Counter
 from typing import Generator
 
 import pandas as pd
 import pytest
 import sqlalchemy as sa
+from dash import no_update
 
-from src import EXT_TABLE_DTYPES
 from src.app import ui_callbacks as ui
+from src.basic_strategy.rules import Rules
 
 
 @pytest.fixture(scope="session")
@@ -34,12 +34,10 @@ def setup_db() -> Generator[tuple[sa.engine.Engine, pd.DataFrame], None, None]:
 
 def test_cb_load_data(setup_db: tuple[sa.engine.Engine, pd.DataFrame]) -> None:
     engine, df = setup_db
-    data = ui.load_data(1, engine)
-    df["date"] = df["upload_time"].dt.date
-    df["count"] = 1
-    df["total"] = 1
-    data_df = pd.DataFrame(data).astype(EXT_TABLE_DTYPES)
-    pd.testing.assert_frame_equal(data_df, df.astype(EXT_TABLE_DTYPES))
+    version = ui.load_data(1, None, engine)
+    assert version == f"{len(df) - 1}.{len(df)}"
+    assert ui.load_data(2, version, engine) is no_update
+    assert ui.load_data(2, "0.0", engine) == version
 
 
 @pytest.mark.parametrize("status", [True, False])
@@ -74,32 +72,43 @@ def test_cb_plot_data_callback(
     move_list: list,
     do_abs_vals: str,
 ) -> None:
-    _, df = setup_db
-    df["date"] = df["upload_time"].dt.date
-    df["count"] = 1
-    df["total"] = 1
-    df = df.astype(EXT_TABLE_DTYPES)
+    engine, _ = setup_db
     graphs = ui.plot_data_callback(
-        df.to_dict("records"), user_switch, mode_switch, move_switch, user_list, mode_list, move_list, do_abs_vals
+        ui.load_data(1, None, engine),
+        user_switch,
+        mode_switch,
+        move_switch,
+        user_list,
+        mode_list,
+        move_list,
+        do_abs_vals,
+        engine,
     )
     assert len(graphs) == 2 * max(1, len(user_list)) * max(1, len(mode_list))
 
 
-def test_cb_populate_user_dropdown(setup_db: tuple[sa.engine.Engine, pd.DataFrame]) -> None:
-    _, df = setup_db
-    df["date"] = df["upload_time"].dt.date
-    df["count"] = 1
-    df["total"] = 1
-    df = df.astype(EXT_TABLE_DTYPES)
-    users = ui.populate_user_dropdown(df.to_dict("records"))
-    assert Counter(users) == Counter(["user1", "user2"])
-
-
-def test_cb_populate_mode_dropdown(setup_db: tuple[sa.engine.Engine, pd.DataFrame]) -> None:
-    _, df = setup_db
-    df["date"] = df["upload_time"].dt.date
-    df["count"] = 1
-    df["total"] = 1
-    df = df.astype(EXT_TABLE_DTYPES)
-    mode = ui.populate_mode_dropdown(df.to_dict("records"))
-    assert Counter(mode) == Counter(["basic", "soft", "hard", "split"])
+def test_cb_populate_dropdowns(setup_db: tuple[sa.engine.Engine, pd.DataFrame]) -> None:
+    engine, _ = setup_db
+    users, modes = ui.populate_dropdowns(ui.load_data(1, None, engine), engine)
+    assert users == ["user1", "user2"]
+    assert modes == ["basic", "hard", "soft", "split"]
+    assert ui.populate_dropdowns(None, engine) == ([], [])
+
+
+def test_cb_save_rules() -> None:
+    rules, status = ui.save_rules(2, True, False, True, False)
+    assert rules["decks"] == 2 and rules["hit_soft_17"] and not rules["double_after_split"]
+    assert Rules(**rules).key in status
+
+
+def test_cb_plot_data_callback_cached(setup_db: tuple[sa.engine.Engine, pd.DataFrame]) -> None:
+    engine, _ = setup_db
+    version = ui.load_data(1, None, engine)
+    args = (version, True, False, False, ["user1"], [], [], "percent", engine)
+    ui.FIGURE_CACHE.clear()
+    misses = ui.FIGURE_CACHE.misses
+    first = ui.plot_data_callback(*args)
+    hits = ui.FIGURE_CACHE.hits
+    second = ui.plot_data_callback(*args)
+    assert ui.FIGURE_CACHE.misses == misses + 1 and ui.FIGURE_CACHE.hits == hits + 1
+    assert second[1].children[0].children.figure is first[1].children[0].children.figure
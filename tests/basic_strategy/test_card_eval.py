@@ -1,3 +1,9 @@
+import itertools
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
 import pytest
 
 from src.basic_strategy import card_eval as bs
@@ -212,3 +218,44 @@ def test_hard_double(card1: str, card2: str, dealer_value: str):
         assert res == "s"
     else:
         assert res == "h"
+
+
+@pytest.mark.parametrize("mode", ["basic", "split", "soft", "hard"])
+def test_card_eval_table(mode: str):
+    ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
+    for card1, card2, dealer_value in itertools.product(ranks, repeat=3):
+        hand = Hand([Card(SUIT, card1), Card("h", card2)])
+        dealer = Card(SUIT, dealer_value)
+        assert bs.card_eval(hand, dealer, mode) == bs.rule_eval(hand, dealer, mode)
+
+
+@pytest.mark.parametrize("cards", ["2s3h4d", "As5h2d", "Th2h", "8s8h"])
+@pytest.mark.parametrize("mode", ["basic", "soft"])
+def test_card_eval_rule_fallback(cards: str, mode: str):
+    hand = Hand.from_string(cards)
+    dealer = Card(SUIT, "T")
+    assert bs.card_eval(hand, dealer, mode) == bs.rule_eval(hand, dealer, mode)
+
+
+@pytest.mark.parametrize("mode", ["basic", "split", "soft", "hard"])
+def test_card_eval_batch(mode: str):
+    ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
+    card1, card2, dealer_rank = map(list, zip(*itertools.product(ranks, repeat=3)))
+    dealer_card = [Card(SUIT, rank).value for rank in dealer_rank]
+    res = bs.card_eval_batch(pd.Series(card1), np.array(card2), dealer_card, mode)
+    for move, c1, c2, d in zip(res, card1, card2, dealer_rank):
+        assert move == bs.card_eval(Hand([Card(SUIT, c1), Card("h", c2)]), Card(SUIT, d), mode)
+
+
+def test_card_eval_batch_modes():
+    res = bs.card_eval_batch(["8", "8", "A"], ["8", "8", "A"], ["6", "6", "4"], ["basic", "soft", "hard"])
+    assert res.tolist() == ["spl", "s", "s"]
+
+
+def test_import_without_database() -> None:
+    code = (
+        "import sys, src.basic_strategy.card_eval, src.basic_strategy.mode_selector;"
+        "print(sorted({'numpy', 'pandas', 'sqlalchemy', 'src.storage.database'} & set(sys.modules)))"
+    )
+    process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert process.stdout.strip() == "[]"
@@ -0,0 +1,86 @@
+import pytest
+
+from src.basic_strategy import counting
+from src.basic_strategy.card_eval import card_eval
+from src.basic_strategy.hand import CARDS, Card, Hand
+from src.basic_strategy.mode_selector import CountingShoe, deal_solo_cards
+
+SUIT = "s"
+
+
+def test_hi_lo_balanced():
+    assert sum(counting.HI_LO) == 0
+    assert counting.HI_LO[Card(SUIT, "5").code] == 1
+    assert counting.HI_LO[Card(SUIT, "8").code] == 0
+    assert counting.HI_LO[Card(SUIT, "A").code] == -1
+
+
+@pytest.mark.parametrize("decks", [1, 6])
+def test_counting_shoe(decks: int):
+    shoe = CountingShoe(decks, penetration=1.0, seed=1)
+    dealt = []
+    for _ in range(13 * decks):
+        dealt += deal_solo_cards("count", shoe)
+        assert shoe.running_count == sum(counting.HI_LO[card.code] for card in dealt)
+    assert shoe.running_count == 0 and shoe.cards_left == 0
+    shoe.deal()
+    assert shoe.cards_left == 52 * decks - 1
+
+
+def test_counting_shoe_reshuffle():
+    shoe = CountingShoe(1, penetration=0.5, seed=2)
+    while not shoe.needs_shuffle:
+        deal_solo_cards("count", shoe)
+    deal_solo_cards("count", shoe)
+    assert shoe.cursor == 4
+    assert shoe.running_count == sum(counting.HI_LO[code] for code in shoe.codes[:4])
+
+
+def test_true_count():
+    assert counting.true_count(6, 156) == 2.0
+    assert counting.true_count(-3, 26) == -6.0
+    assert counting.true_count(4, 0) == 208.0
+
+
+@pytest.mark.parametrize(
+    "cards,dealer_rank,count,move",
+    [
+        ("9s3h", "3", 2, "s"),
+        ("9s3h", "3", 1.9, "h"),
+        ("Ts3h", "2", -0.5, "s"),
+        ("Ts3h", "2", -1.5, "h"),
+        ("TsKh", "6", 4, "spl"),
+        ("TsKh", "6", 3, "s"),
+        ("6s4h", "A", 4, "d"),
+        ("6s4h", "A", 3.9, "h"),
+        ("Ts6h", "T", 5, "sur"),
+        ("As7h", "3", 10, "ds"),
+        ("5s5h", "T", 6, "d"),
+        ("5s5h", "T", 3, "h"),
+    ],
+)
+def test_count_eval(cards: str, dealer_rank: str, count: float, move: str):
+    assert counting.count_eval(Hand.from_string(cards), Card(SUIT, dealer_rank), "basic", count) == move
+
+
+def test_count_eval_no_split_mode():
+    hand, dealer = Hand.from_string("TsKh"), Card(SUIT, "6")
+    assert counting.count_eval(hand, dealer, "hard", 6) == card_eval(hand, dealer, "hard")
+
+
+@pytest.mark.parametrize("cards", ["6s6h", "Ts2h"])
+def test_count_eval_no_split_mode_hard_total(cards: str):
+    hand, dealer = Hand.from_string(cards), Card(SUIT, "4")
+    assert counting.count_eval(hand, dealer, "hard", -3) == "h"
+    assert counting.count_eval(hand, dealer, "hard", 1) == "s"
+
+
+@pytest.mark.parametrize("count", [-2, 3, 10])
+def test_count_eval_das_pair_keeps_split(count: float):
+    hand, dealer = Hand.from_string("6s6h"), Card(SUIT, "2")
+    assert counting.count_eval(hand, dealer, "basic", count) == "das"
+
+
+def test_count_eval_multi_card():
+    hand, dealer = Hand([CARDS[0], CARDS[1], CARDS[2]]), Card(SUIT, "T")
+    assert counting.count_eval(hand, dealer, "basic", 10) == card_eval(hand, dealer, "basic")
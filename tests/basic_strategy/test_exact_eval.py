@@ -0,0 +1,73 @@
+import pathlib
+
+import pytest
+
+from src.basic_strategy import exact_eval as ee
+from src.basic_strategy.hand import Card, Hand
+
+SUIT = "s"
+
+
+@pytest.mark.parametrize("upcard", ["2", "3", "4", "5", "6", "7", "8", "9", "T", "A"])
+@pytest.mark.parametrize("decks", [None, 1])
+@pytest.mark.parametrize("hit_soft_17", [True, False])
+def test_dealer_distribution(upcard: str, decks: int, hit_soft_17: bool):
+    dist = ee.dealer_distribution(Card(SUIT, upcard), decks, [Card("h", "9"), Card("d", "7")], hit_soft_17)
+    assert len(dist) == len(ee.OUTCOMES)
+    assert sum(dist) == pytest.approx(1.0)
+    if upcard not in ["T", "A"]:
+        assert dist[ee.BLACKJACK] == 0.0
+
+
+@pytest.mark.parametrize("upcard,bust", [("2", 0.3536), ("6", 0.4232), ("T", 0.2121), ("A", 0.1153)])
+def test_dealer_bust_infinite_deck(upcard: str, bust: float):
+    assert ee.dealer_distribution(Card(SUIT, upcard))[ee.BUST] == pytest.approx(bust, abs=1e-4)
+
+
+def test_shoe_composition():
+    assert ee.shoe_composition(None) is None
+    comp = ee.shoe_composition(2, Hand.from_string("AsKdAh").cards)
+    assert comp == (6, 8, 8, 8, 8, 8, 8, 8, 8, 31)
+
+
+@pytest.mark.parametrize("decks", [None, 1])
+def test_exact_eval(decks: int):
+    evs = ee.exact_eval(Hand.from_string("Ts6h"), Card(SUIT, "T"), decks)
+    assert -0.6 < evs["h"] < evs["sur"] + 0.05 and evs["s"] < -0.5
+    evs = ee.exact_eval(Hand.from_string("5s6h"), Card(SUIT, "6"), decks)
+    assert evs["d"] == max(evs.values()) and evs["d"] == pytest.approx(2 * evs["h"], rel=0.1)
+    evs = ee.exact_eval(Hand.from_string("TsTh"), Card(SUIT, "6"), decks)
+    assert evs["s"] == max(evs.values()) and evs["s"] > 0.6
+
+
+def test_stand_outcome_busted():
+    assert ee.stand_outcome(22, ee.dealer_distribution(Card(SUIT, "5"))) == -1.0
+
+
+def test_disk_cache(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ee, "DISK_CACHE_FILE", tmp_path / "dealer_probs.json")
+    monkeypatch.setattr(ee, "DISK_CACHE", {})
+    ee.clear_caches()
+    first = ee.dealer_distribution(Card(SUIT, "7"), 2)
+    assert ee.load_disk_cache(tmp_path / "dealer_probs.json") == {f"{ee.SOLVER_VERSION}|2|7|0": list(first)}
+    ee.clear_caches()
+    assert ee.dealer_distribution(Card(SUIT, "7"), 2) == first
+    stats = ee.cache_stats()
+    assert stats["disk_hits"] == 1 and stats["disk_misses"] == 0 and stats["lru_size"] == 0
+    assert stats["queries"] == 1 and stats["mean_query_ms"] > 0
+
+
+def test_disk_cache_of_other_version(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path / "dealer_probs.json"
+    path.write_text('{"2|7|0": [1, 0, 0, 0, 0, 0, 0]}')
+    assert ee.load_disk_cache(path) == {}
+    monkeypatch.setattr(ee, "SOLVER_VERSION", ee.SOLVER_VERSION + 1)
+    path.write_text(f'{{"version": {ee.SOLVER_VERSION - 1}, "distributions": {{}}}}')
+    assert ee.load_disk_cache(path) == {}
+
+
+@pytest.mark.parametrize("payout", [1.5, 1.2])
+def test_natural_payout(payout: float):
+    evs = ee.exact_eval(Hand.from_string("AsKh"), Card(SUIT, "6"), blackjack_payout=payout)
+    assert evs["s"] == payout
+    assert ee.action_ev(Hand.from_string("7s7h7d"), Card(SUIT, "6"), "s") < 1.0
@@ -1,6 +1,6 @@
 import pytest
 
-from src.basic_strategy.hand import Card, Hand
+from src.basic_strategy.hand import CARDS, Card, Hand
 
 
 @pytest.mark.parametrize(
@@ -65,3 +65,65 @@ def test_card_from_string(rank: str, suit: str, value: int):
     card = Card.from_string(card_str)
     assert card.rank == rank
     assert card.suit == suit
+
+
+@pytest.mark.parametrize("rank", ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"])
+@pytest.mark.parametrize("suit", ["s", "h", "c", "d"])
+def test_card_interned(rank: str, suit: str):
+    card = Card(suit, rank)
+    assert card is Card.from_string(f"{rank}{suit}")
+    assert CARDS[card.code] is card
+    assert not hasattr(card, "__dict__")
+    with pytest.raises(AttributeError):
+        card.rank = "2"
+
+
+@pytest.mark.parametrize("card_str", ["1s", "Ax", "", "10h"])
+def test_card_from_invalid_string(card_str: str):
+    with pytest.raises(KeyError):
+        Card.from_string(card_str)
+
+
+def test_hand_face_up():
+    hand = Hand.from_string("KcAh", "10")
+    assert hand.face_up == [True, False]
+    assert hand.display_cards() == [hand.cards[0].unicode_front, Card.unicode_back]
+    hand.turn_card(1)
+    assert hand.display_cards() == [card.unicode_front for card in hand.cards]
+
+
+@pytest.mark.parametrize(
+    "cards,values",
+    zip(
+        ["AsAdAhAc", "5s6dAhTc", "Ah6s9d", "KcKdAs", "AsAdAh9c"],
+        [[11, 12, 13, 14], [5, 11, 12, 22], [11, 17, 16], [10, 20, 21], [11, 12, 13, 12]],
+    ),
+)
+def test_add_pop_card(cards: str, values: list[int]):
+    hand = Hand([])
+    for card, value in zip(Hand.from_string(cards).cards, values):
+        hand.add_card(card)
+        assert hand.value == value
+        assert hand.value == Hand(list(hand.cards)).value
+        assert hand.is_soft == (hand.soft_aces == 1)
+    for value in reversed(values[:-1]):
+        hand.pop_card()
+        assert hand.value == value
+    hand.pop_card()
+    assert hand.cards == [] and hand.face_up == [] and hand.value == 0
+
+
+def test_hand_copies_card_list():
+    cards, face_up = Hand.from_string("Ts6d").cards, [True, False]
+    hand = Hand(cards, face_up)
+    hand.add_card(Card("h", "5"))
+    hand.pop_card()
+    hand.pop_card()
+    assert len(cards) == 2 and face_up == [True, False]
+
+
+def test_hand_soft_flag():
+    hand = Hand.from_string("As6d")
+    assert hand.is_soft and hand.hard_total == 7
+    hand.add_card(Card("h", "9"))
+    assert not hand.is_soft and hand.value == 16
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 
 from src.basic_strategy import mode_selector
@@ -15,3 +17,54 @@ def test_mode_selector(mode: str):
         assert cards[0].rank == cards[1].rank
     elif mode == "hard":
         assert cards[0].rank != "A" and cards[1].rank != "A"
+
+
+@pytest.mark.parametrize("decks", [1, 2, 6])
+def test_shoe_deals_every_card_once(decks: int):
+    shoe = mode_selector.Shoe(decks, seed=decks)
+    codes = sorted(shoe.deal_code() for _ in range(52 * decks))
+    assert codes == sorted(list(range(52)) * decks)
+    assert shoe.cards_left == 0
+    assert isinstance(shoe.deal(), Card)
+    assert shoe.cards_left == 52 * decks - 1
+
+
+def test_shoe_penetration():
+    shoe = mode_selector.Shoe(6, penetration=0.75, seed=0)
+    shoe.deal_cards(233)
+    assert not shoe.needs_shuffle
+    shoe.deal()
+    assert shoe.needs_shuffle
+    shoe.shuffle()
+    assert shoe.cursor == 0 and not shoe.needs_shuffle
+
+
+def test_shoe_view():
+    shoe = mode_selector.Shoe(view=mode_selector.SOFT_VIEW, seed=0)
+    cards = shoe.deal_cards(len(mode_selector.SOFT_VIEW))
+    assert {card.rank for card in cards} == set(mode_selector.RANKS[:-5])
+
+
+def test_shoe_seed():
+    first, second = mode_selector.Shoe(2, seed=3), mode_selector.Shoe(2, seed=3)
+    assert first.deal_cards(20) == second.deal_cards(20)
+
+
+def test_concurrent_deals_share_a_shoe():
+    shoe = mode_selector.CountingShoe(decks=4, penetration=1.0, seed=0)
+    barrier = threading.Barrier(4)
+    hands: list[list[Card]] = []
+
+    def deal() -> None:
+        barrier.wait()
+        for _ in range(13):
+            hands.append(mode_selector.deal_solo_cards("count", shoe))
+
+    threads = [threading.Thread(target=deal) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    codes = sorted(card.code for hand in hands for card in hand)
+    assert codes == sorted(list(range(52)) * 4)
+    assert shoe.cards_left == 0 and shoe.running_count == 0
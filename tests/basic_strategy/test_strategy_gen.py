@@ -0,0 +1,74 @@
+import itertools
+import json
+import pathlib
+
+import pytest
+
+from src.basic_strategy import rules as rules_module
+from src.basic_strategy import strategy_gen as sg
+from src.basic_strategy.card_eval import HARD, PAIR, SOFT, card_eval
+from src.basic_strategy.hand import Card, Hand
+from src.basic_strategy.rules import Rules
+
+SUIT = "s"
+
+
+@pytest.fixture(scope="module")
+def default_table() -> list:
+    return sg.generate_strategy(Rules())
+
+
+@pytest.mark.parametrize(
+    "rules,hand_class,row,dealer_value,move",
+    [
+        (Rules(), HARD, 11, 11, "h"),
+        (Rules(hit_soft_17=True), HARD, 11, 11, "d"),
+        (Rules(), PAIR, 8, 11, "spl"),
+        (Rules(hit_soft_17=True), PAIR, 8, 11, "sur"),
+        (Rules(), SOFT, 18, 2, "s"),
+        (Rules(hit_soft_17=True), SOFT, 18, 2, "ds"),
+        (Rules(), PAIR, 2, 2, "spl"),
+        (Rules(double_after_split=False), PAIR, 2, 2, "h"),
+        (Rules(), HARD, 16, 10, "sur"),
+        (Rules(late_surrender=False), HARD, 16, 10, "h"),
+        (Rules(), HARD, 12, 4, "s"),
+        (Rules(), PAIR, 11, 11, "spl"),
+    ],
+)
+def test_generate_strategy(rules: Rules, hand_class: int, row: int, dealer_value: int, move: str):
+    assert sg.generate_strategy(rules)[hand_class][row][dealer_value][0] == move
+
+
+def test_generated_table_layout(default_table: list):
+    ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "A"]
+    for card1, card2, dealer_rank in itertools.product(ranks, repeat=3):
+        hand = Hand([Card(SUIT, card1), Card("h", card2)])
+        for mode in ["basic", "soft"]:
+            move = card_eval(hand, Card(SUIT, dealer_rank), mode, default_table)
+            assert move in ["s", "h", "d", "ds", "spl", "sur"]
+            if mode == "soft":
+                assert move != "spl"
+
+
+def test_rules_key(monkeypatch: pytest.MonkeyPatch):
+    assert Rules().key == Rules().key
+    assert Rules(decks=2).key != Rules().key
+    key = Rules().key
+    monkeypatch.setattr(rules_module, "GENERATOR_VERSION", rules_module.GENERATOR_VERSION + 1)
+    assert Rules().key != key
+
+
+def test_strategy_table_disk_cache(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(sg, "STRATEGY_CACHE_DIR", tmp_path / "strategy")
+    monkeypatch.setattr(sg, "STRATEGY_TABLES", {})
+    rules = Rules(decks=2, hit_soft_17=True)
+    table = sg.strategy_table(rules)
+    assert (tmp_path / "strategy" / f"{rules.key}.json").exists()
+    assert sg.strategy_table(rules) is table
+    monkeypatch.setattr(sg, "STRATEGY_TABLES", {})
+    old_rules = Rules(decks=3)
+    (tmp_path / "strategy" / "0123456789abcdef.json").write_text(
+        json.dumps({"rules": old_rules.__dict__, "table": []})
+    )
+    sg.warm_strategy_tables(rules)
+    assert sg.STRATEGY_TABLES == {rules: table}
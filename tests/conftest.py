@@ -0,0 +1,30 @@
+"""Keep the solver caches and the answers written by the tests out of the db folder of the working tree."""
+
+from typing import Generator
+
+import pytest
+
+from src.basic_strategy import exact_eval, strategy_gen
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_caches(tmp_path_factory: pytest.TempPathFactory) -> Generator[None, None, None]:
+    cache_dir = tmp_path_factory.mktemp("db")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(exact_eval, "DISK_CACHE_FILE", cache_dir / "dealer_probs.json")
+        monkeypatch.setattr(exact_eval, "DISK_CACHE", {})
+        monkeypatch.setattr(strategy_gen, "STRATEGY_CACHE_DIR", cache_dir / "strategy")
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_answers(tmp_path_factory: pytest.TempPathFactory) -> Generator[None, None, None]:
+    from src import create_engine
+    from src.storage.buffer import ANSWER_BUFFER
+
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('answers') / 'db.sqlite'}")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(ANSWER_BUFFER, "store", engine)
+        yield
+        ANSWER_BUFFER.flush()
+    engine.dispose()
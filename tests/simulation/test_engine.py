@@ -0,0 +1,82 @@
+import collections
+
+import pytest
+
+from src.basic_strategy.hand import Card, Hand
+from src.basic_strategy.mode_selector import Shoe
+from src.basic_strategy.rules import Rules
+from src.simulation import engine
+
+
+class NoShuffle:
+    def random(self) -> float:
+        return 0.0
+
+
+def rigged_shoe(cards: str) -> Shoe:
+    shoe = Shoe(view=[card.code for card in Hand.from_string(cards).cards])
+    shoe.rng = NoShuffle()  # type: ignore[assignment]
+    return shoe
+
+
+@pytest.mark.parametrize(
+    "cards,outcome",
+    [
+        ("As9dTh7c", 1.5),  # player blackjack
+        ("AsAdThTc", 0.0),  # both blackjack
+        ("TsAd9hTc", -1.0),  # dealer blackjack
+        ("TsTd6h9c", -0.5),  # surrender 16 vs T
+        ("6s6d5hTc9dTs", 2.0),  # double 11 vs 6, dealer busts
+        ("Ts8dTh9c", 1.0),  # stand 20 vs 8, dealer 17
+        ("Ts7d7hTc", 0.0),  # stand 17 vs 7, dealer 17
+        ("Ts7d6h9c9s", -1.0),  # hit 16 vs 7, bust
+        ("8s6d8hTcTdThTs", 2.0),  # split 8s vs 6, 18 and 18 vs dealer bust 25
+    ],
+)
+def test_play_round(cards: str, outcome: float):
+    shoe = rigged_shoe(cards)
+    assert engine.play_round(shoe, Rules(), collections.Counter()) == outcome
+
+
+def test_play_round_no_surrender():
+    shoe = rigged_shoe("TsTd6h9c5s")
+    actions: collections.Counter = collections.Counter()
+    assert engine.play_round(shoe, Rules(late_surrender=False), actions) == 1.0
+    assert actions == {"h": 1}
+
+
+@pytest.mark.parametrize("hit_soft_17,dealer_cards", [(False, 2), (True, 3)])
+def test_play_dealer(hit_soft_17: bool, dealer_cards: int):
+    dealer = Hand.from_string("As6d")
+    engine.play_dealer(rigged_shoe("2s"), Rules(hit_soft_17=hit_soft_17), dealer)
+    assert len(dealer.cards) == dealer_cards
+
+
+@pytest.mark.parametrize(
+    "cards,can_double,move",
+    [("5s6d", True, "d"), ("5s6d", False, "h"), ("As7d", True, "d"), ("As7d", False, "s"), ("As2d3c", False, "h")],
+)
+def test_decide(cards: str, can_double: bool, move: str):
+    hand = Hand.from_string(cards)
+    assert engine.decide(hand, Card("s", "4"), Rules(), False, can_double, False) == move
+
+
+@pytest.mark.parametrize("soft,total", [(True, total) for total in range(13, 21)] + [(False, t) for t in range(4, 21)])
+def test_representative_hands(soft: bool, total: int):
+    hand = engine.REPRESENTATIVE_HANDS[(soft, total)]
+    assert hand.value == total and hand.is_soft == soft
+
+
+def test_simulate_progress():
+    results = list(engine.simulate(2500, seed=1, report_every=1000))
+    assert [result.rounds for result in results] == [1000, 2000, 2500]
+    final = results[-1]
+    assert final.total_return == engine.run_simulation(2500, seed=1).total_return
+    assert -1.0 < final.ev < 1.0 and final.variance > 0
+    assert sum(final.action_frequencies.values()) == pytest.approx(1.0)
+
+
+def test_simulate_deterministic():
+    first = engine.run_simulation(1000, seed=7)
+    second = engine.run_simulation(1000, seed=7)
+    assert (first.total_return, first.action_counts) == (second.total_return, second.action_counts)
@@ -0,0 +1,94 @@
+"""Test the aggregation of the training data in the database."""
+
+import datetime
+import itertools
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from src import EXT_TABLE_DTYPES, TABLE_DTYPES, ensure_schema
+from src.stats import create_plots as cp
+from src.stats.dataset import add_plot_columns
+
+
+@pytest.fixture(scope="module")
+def setup_db() -> tuple[sa.engine.Engine, pd.DataFrame]:
+    rng = np.random.default_rng(0)
+    rows = 500
+    df = pd.DataFrame(
+        {
+            "user": rng.choice(["user1", "user2", "user3"], rows),
+            "training_type": rng.choice(["basic", "soft", "hard"], rows),
+            "was_correct": rng.random(rows) < 0.7,
+            "correct_move": rng.choice(["s", "h", "d", "sur"], rows),
+            "guessed_move": rng.choice(["s", "h", "d", "spl"], rows),
+            "card1": "T",
+            "card2": "6",
+            "hand_value": 16,
+            "dealer_card": rng.integers(2, 12, rows),
+            "upload_time": [
+                datetime.datetime(2024, 6, 1) + datetime.timedelta(hours=int(h)) for h in rng.integers(0, 24 * 5, rows)
+            ],
+        }
+    ).astype(TABLE_DTYPES)
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    with engine.begin() as conn:
+        df.to_sql("training_data", conn, if_exists="append", index=False)
+    return engine, add_plot_columns(df).astype(EXT_TABLE_DTYPES)
+
+
+def test_get_data(setup_db: tuple[sa.engine.Engine, pd.DataFrame]) -> None:
+    engine, df = setup_db
+    res = cp.get_data(engine)
+    assert res.index.tolist() == list(range(1, len(df) + 1))
+    pd.testing.assert_frame_equal(res.reset_index(drop=True).astype(EXT_TABLE_DTYPES), df)
+
+
+@pytest.mark.parametrize("user_list", [[], ["user1", "user3"]])
+@pytest.mark.parametrize("mode_list", [[], ["soft"]])
+@pytest.mark.parametrize("move_list", [[], ["h", "spl"]])
+def test_read_aggregates(
+    setup_db: tuple[sa.engine.Engine, pd.DataFrame], user_list: list, mode_list: list, move_list: list
+) -> None:
+    engine, df = setup_db
+    group_list, _ = cp.set_optional_lists(bool(user_list), bool(mode_list), bool(move_list), True)
+    expected = cp.transform_data(cp.filter_data(df, user_list, mode_list, move_list), group_list)
+    res = cp.read_aggregates(engine, group_list, user_list, mode_list, move_list)
+    assert res.columns.tolist() == expected.columns.tolist()
+    pd.testing.assert_frame_equal(res, expected, check_dtype=False)
+
+
+def test_main_plot_from_database(setup_db: tuple[sa.engine.Engine, pd.DataFrame]) -> None:
+    engine, df = setup_db
+    for user_list, mode_list in itertools.product([[], ["user2"]], [[], ["basic", "hard"]]):
+        from_db = cp.main_plot(None, user_list, mode_list, ["s"], False, engine)
+        from_data = cp.main_plot(df.to_dict("records"), user_list, mode_list, ["s"], False)
+        for user, figures in from_data.items():
+            for mode, figure in figures.items():
+                assert json.loads(from_db[user][mode].to_json()) == json.loads(figure.to_json())
+
+
+def test_plot_figure_trace_order() -> None:
+    dataframe = pd.DataFrame(
+        {
+            "date": [datetime.date(2024, 6, 1), datetime.date(2024, 6, 1), datetime.date(2024, 6, 2)],
+            "user": ["user1", "user1", "user1"],
+            "correct_move": ["s", "h", "h"],
+            "was_correct": [True, False, True],
+            "count": [2, 1, 3],
+            "total": [3, 3, 3],
+        }
+    )
+    figures = cp.plot_figure(dataframe, "percent", ["user1", "user2"], None, ["s", "h"])
+    traces = json.loads(figures["user1"]["all_modes"].to_json())["data"]
+    assert [(trace["name"], trace["hovertemplate"], trace["showlegend"]) for trace in traces] == [
+        ("s", "%{y:.4f} True", True),
+        ("h", "%{y:.4f} True", True),
+        ("h", "%{y:.4f} False", False),
+    ]
+    assert traces[1]["x"] == ["2024-06-02"] and traces[1]["y"] == [1.0]
+    assert figures["user2"]["all_modes"].data == ()
@@ -0,0 +1,36 @@
+"""Test the version of the stored training data."""
+
+import datetime
+
+import sqlalchemy as sa
+
+from src import ensure_schema, training_data
+from src.stats.dataset import dataset_version
+
+
+def insert(engine: sa.engine.Engine, users: list[str]) -> None:
+    record = {
+        "training_type": "basic",
+        "was_correct": True,
+        "correct_move": "s",
+        "guessed_move": "s",
+        "card1": "T",
+        "card2": "8",
+        "hand_value": 18,
+        "dealer_card": 9,
+        "upload_time": datetime.datetime(2024, 6, 1, 12),
+    }
+    with engine.begin() as conn:
+        conn.execute(training_data.insert(), [{**record, "user": user} for user in users])
+
+
+def test_dataset_version() -> None:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    assert dataset_version(engine) is None
+    insert(engine, ["user1", "user2"])
+    assert dataset_version(engine) == "2.2"
+    with engine.begin() as conn:
+        conn.execute(sa.delete(training_data).where(training_data.c.id == 2))
+    insert(engine, ["user3"])
+    assert dataset_version(engine) == "2.3"
@@ -0,0 +1,52 @@
+"""Test the cache of the dashboard figures."""
+
+import sys
+
+import numpy as np
+from plotly import graph_objects as go
+
+from src.stats.figure_cache import FigureCache, figure_size
+
+
+def figures(points: int) -> dict:
+    return {"all user": {"all_modes": go.Figure(go.Bar(x=list(range(points)), y=list(range(points))))}}
+
+
+def test_hits_and_misses() -> None:
+    cache = FigureCache()
+    built = []
+    first = cache.get("a", lambda: built.append(1) or figures(3))
+    assert cache.get("a", lambda: built.append(1) or figures(3)) is first
+    assert built == [1]
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1, "bytes": figure_size(first)}
+
+
+def test_evict_by_entries() -> None:
+    cache = FigureCache(max_entries=2)
+    cache.get("a", lambda: figures(1))
+    cache.get("b", lambda: figures(1))
+    cache.get("a", lambda: figures(1))
+    cache.get("c", lambda: figures(1))
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.evictions == 1
+
+
+def test_evict_by_bytes() -> None:
+    size = figure_size(figures(100))
+    cache = FigureCache(max_bytes=int(size * 1.5))
+    cache.get("a", lambda: figures(100))
+    cache.get("b", lambda: figures(100))
+    assert list(cache.entries) == ["b"]
+    assert cache.size == size
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+
+def test_figure_size() -> None:
+    assert figure_size(figures(100)) == 2 * 100 * 8
+    dates = np.array(["2024-06-01"] * 10)
+    fig = go.Figure({"type": "bar", "x": dates, "y": np.arange(10, dtype=np.float64)})
+    assert (
+        figure_size({"all user": {"all_modes": fig, "empty": go.Figure()}})
+        == 10 * (8 + sys.getsizeof("2024-06-01")) + 80
+    )
@@ -0,0 +1,90 @@
+"""Test the write-behind answer buffer."""
+
+import pathlib
+import time
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from src.basic_strategy.hand import Card, Hand
+from src.storage.buffer import AnswerBuffer, answer_record
+
+
+@pytest.fixture
+def engine(tmp_path: pathlib.Path) -> sa.engine.Engine:
+    return sa.create_engine(f"sqlite:///{tmp_path / 'answers.sqlite'}")
+
+
+def record(guess: str = "s") -> dict:
+    return answer_record("test_user", "basic", guess, "s", Hand.from_string("Ts8h"), Card("c", "9"))
+
+
+def rows(engine: sa.engine.Engine) -> pd.DataFrame:
+    with engine.begin() as conn:
+        return pd.read_sql("SELECT * FROM training_data", conn)
+
+
+def test_answer_record() -> None:
+    res = answer_record("test_user", "soft", "h", "ds", Hand.from_string("As7d"), Card("c", "A"))
+    assert res["was_correct"] is False
+    assert (res["card1"], res["card2"], res["hand_value"], res["dealer_card"]) == ("A", "7", 18, 11)
+
+
+def test_buffer_flush_on_size(engine: sa.engine.Engine) -> None:
+    buffer = AnswerBuffer(engine, max_rows=5, max_delay=60)
+    for _ in range(5):
+        buffer.add(record())
+    for _ in range(100):
+        if buffer.written_rows:
+            break
+        time.sleep(0.05)
+    assert buffer.flushes == 1 and buffer.written_rows == 5
+    assert len(rows(engine)) == 5
+    buffer.close()
+
+
+def test_buffer_flush_on_time(engine: sa.engine.Engine) -> None:
+    buffer = AnswerBuffer(engine, max_rows=100, max_delay=0.1)
+    buffer.add(record())
+    buffer.add(record("h"))
+    time.sleep(0.5)
+    assert buffer.written_rows == 2
+    assert rows(engine)["was_correct"].tolist() == [1, 0]
+    buffer.close()
+
+
+def test_buffer_close(engine: sa.engine.Engine) -> None:
+    buffer = AnswerBuffer(engine, max_rows=100, max_delay=60)
+    for _ in range(3):
+        buffer.add(record())
+    buffer.close()
+    assert len(rows(engine)) == 3
+    with pytest.raises(RuntimeError):
+        buffer.add(record())
+
+
+def test_buffer_requeue_on_error(tmp_path: pathlib.Path) -> None:
+    buffer = AnswerBuffer(sa.create_engine(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}"), max_delay=60)
+    buffer.add(record())
+    with pytest.raises(sa.exc.OperationalError):
+        buffer.flush()
+    assert len(buffer.records) == 1
+    buffer.store = sa.create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    buffer.close()
+    assert len(rows(buffer.store)) == 1
+
+
+def test_buffer_backoff_and_bound(tmp_path: pathlib.Path) -> None:
+    failing = sa.create_engine(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}")
+    buffer = AnswerBuffer(failing, max_rows=2, max_delay=0.01, max_records=5, min_backoff=0.05, max_backoff=0.2)
+    for _ in range(8):
+        buffer.add(record())
+    assert len(buffer.records) <= 5 and buffer.dropped_rows >= 3
+    time.sleep(0.6)
+    assert 1 <= buffer.failures <= 6
+    assert buffer.retry_at > 0 and buffer.backoff() == 0.2
+    assert len(buffer.records) == 5 and buffer.dropped_rows == 3
+    buffer.store = sa.create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    buffer.close()
+    assert len(rows(buffer.store)) == 5 and buffer.failures == 0
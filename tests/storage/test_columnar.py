@@ -0,0 +1,108 @@
+"""Test the columnar answer log."""
+
+import datetime
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from src import EXT_TABLE_DTYPES, TABLE_DTYPES
+from src.stats import create_plots as cp
+from src.stats.dataset import add_plot_columns, dataset_version
+from src.storage import columnar
+from src.storage.buffer import AnswerBuffer
+from src.storage.columnar import AnswerLog
+
+
+def answers(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "user": rng.choice(["user1", "user2", "user3"], rows),
+            "training_type": rng.choice(["basic", "soft", "hard"], rows),
+            "was_correct": rng.random(rows) < 0.7,
+            "correct_move": rng.choice(["s", "h", "d", "sur"], rows),
+            "guessed_move": rng.choice(["s", "h", "d", "spl"], rows),
+            "card1": rng.choice(["A", "T", "5"], rows),
+            "card2": rng.choice(["2", "9"], rows),
+            "hand_value": rng.integers(4, 21, rows),
+            "dealer_card": rng.integers(2, 12, rows),
+            "upload_time": [
+                datetime.datetime(2024, 6, 1) + datetime.timedelta(minutes=int(m)) for m in rng.integers(0, 7200, rows)
+            ],
+        }
+    ).astype(TABLE_DTYPES)
+
+
+def test_append_and_read(tmp_path: pathlib.Path) -> None:
+    df = answers(250)
+    log = AnswerLog(tmp_path, segment_rows=100)
+    assert log.append(df.iloc[:120]) == 120
+    assert log.append(df.iloc[120:].to_dict("records")) == 130
+    assert len(log) == 250 and len(log.segment_dirs()) == 3
+    reopened = AnswerLog(tmp_path, segment_rows=100)
+    pd.testing.assert_frame_equal(reopened.frame(), df.rename_axis("id"), check_index_type=False)
+    assert reopened.frame(start=240).index.tolist() == list(range(240, 250))
+    assert isinstance(reopened.columns(start=210)["hand_value"], np.memmap)
+
+
+def test_partial_row_is_ignored(tmp_path: pathlib.Path) -> None:
+    log = AnswerLog(tmp_path)
+    log.append(answers(5))
+    with open(log.segment_dirs()[0] / "user.bin", "ab") as file:
+        file.write(b"\x00\x00")
+    assert len(log) == 5
+
+
+def test_append_after_partial_write(tmp_path: pathlib.Path) -> None:
+    df = answers(8)
+    log = AnswerLog(tmp_path)
+    log.append(df.iloc[:5])
+    segment = log.segment_dirs()[0]
+    for column in ["user", "training_type", "hand_value"]:
+        with open(segment / f"{column}.bin", "ab") as file:
+            file.write(b"\x01" * np.dtype(columnar.COLUMN_TYPES[column]).itemsize * 2)
+    assert log.append(df.iloc[5:]) == 3
+    assert len(log) == 8
+    pd.testing.assert_frame_equal(AnswerLog(tmp_path).frame(), df.rename_axis("id"), check_index_type=False)
+
+
+@pytest.mark.parametrize("user_list", [[], ["user1", "user3"]])
+@pytest.mark.parametrize("mode_list", [[], ["soft"]])
+@pytest.mark.parametrize("move_list", [[], ["h", "spl"]])
+def test_aggregate(tmp_path: pathlib.Path, user_list: list, mode_list: list, move_list: list) -> None:
+    df = answers(500)
+    log = AnswerLog(tmp_path)
+    log.append(df)
+    group_list, _ = cp.set_optional_lists(bool(user_list), bool(mode_list), bool(move_list), True)
+    frame = add_plot_columns(df).astype(EXT_TABLE_DTYPES)
+    expected = cp.transform_data(cp.filter_data(frame, user_list, mode_list, move_list), group_list)
+    pd.testing.assert_frame_equal(
+        log.aggregate(group_list, user_list, mode_list, move_list), expected, check_dtype=False
+    )
+
+
+def test_version_and_buffer(tmp_path: pathlib.Path) -> None:
+    log = AnswerLog(tmp_path)
+    assert dataset_version(log) is None
+    buffer = AnswerBuffer(log, max_delay=60)
+    for record in answers(3).to_dict("records"):
+        buffer.add(record)
+    buffer.flush()
+    assert dataset_version(log) == "3"
+    buffer.add(answers(1, 1).to_dict("records")[0])
+    buffer.close()
+    assert dataset_version(log) == "4"
+    assert log.frame().index.tolist() == [0, 1, 2, 3]
+
+
+def test_answer_store(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = sa.create_engine("sqlite://")
+    assert columnar.answer_store(engine) is engine
+    monkeypatch.setattr(columnar, "ANSWER_BACKEND", "columnar")
+    monkeypatch.setattr(columnar, "ANSWER_LOG_DIR", tmp_path)
+    columnar.default_answer_log.cache_clear()
+    assert columnar.answer_store(engine).directory == tmp_path
+    columnar.default_answer_log.cache_clear()
@@ -0,0 +1,44 @@
+"""Test the database engine factory."""
+
+import pathlib
+
+import pytest
+import sqlalchemy as sa
+
+from src import create_engine, ensure_schema, training_data
+
+
+def test_sqlite_pragmas(tmp_path: pathlib.Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'db' / 'test.sqlite'}")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+    assert isinstance(engine.pool, sa.QueuePool)
+
+
+def test_reader_does_not_block_writer(tmp_path: pathlib.Path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.sqlite'}")
+    ensure_schema(engine)
+    record = {"user": "test_user", "training_type": "basic", "hand_value": 12}
+    with engine.begin() as conn:
+        conn.execute(training_data.insert(), [record])
+    with engine.connect() as reader:
+        reader.exec_driver_sql("BEGIN")
+        assert reader.execute(sa.select(sa.func.count()).select_from(training_data)).scalar() == 1
+        with engine.begin() as writer:
+            writer.execute(training_data.insert(), [record])
+        assert reader.execute(sa.select(sa.func.count()).select_from(training_data)).scalar() == 1
+    with engine.connect() as conn:
+        assert conn.execute(sa.select(sa.func.count()).select_from(training_data)).scalar() == 2
+
+
+def test_memory_engine() -> None:
+    engine = create_engine("sqlite://")
+    ensure_schema(engine)
+    assert sa.inspect(engine).has_table("training_data")
+
+
+def test_reject_other_databases() -> None:
+    with pytest.raises(ValueError, match="only sqlite"):
+        create_engine("postgresql://user@localhost/blackjack")
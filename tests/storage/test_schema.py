@@ -0,0 +1,138 @@
+"""Test the declared training_data schema and the migration of old databases."""
+
+import datetime
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from src import (
+    TABLE_DTYPES,
+    ensure_schema,
+    rebuild_rollup,
+    training_daily_rollup,
+    training_data,
+    training_distinct_values,
+)
+from src.storage.database import rebuild_distinct_values
+
+
+def legacy_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "user": ["user1", "user2", "user1"],
+            "training_type": ["basic", "soft", "hard"],
+            "was_correct": [True, False, True],
+            "correct_move": ["d", "ds", "h"],
+            "guessed_move": ["d", "h", None],
+            "card1": ["3", "A", "5"],
+            "card2": ["5", "7", "6"],
+            "hand_value": [8, 18, 11],
+            "dealer_card": [4, 6, 11],
+            "upload_time": [datetime.datetime(2024, 6, 1)] * 3,
+        }
+    ).astype(TABLE_DTYPES)
+
+
+def test_create_schema() -> None:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    inspector = sa.inspect(engine)
+    assert inspector.get_pk_constraint("training_data")["constrained_columns"] == ["id"]
+    assert {tuple(index["column_names"]) for index in inspector.get_indexes("training_data")} == {
+        ("user", "upload_time"),
+        ("training_type", "upload_time"),
+    }
+
+
+@pytest.mark.parametrize("index,ids", [(True, [0, 1, 2]), (False, [1, 2, 3])])
+def test_migrate_legacy_table(index: bool, ids: list) -> None:
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        legacy_frame().to_sql("training_data", conn, index=index)
+    ensure_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(training_data.insert(), [legacy_frame().iloc[0].to_dict()])
+        dataframe = pd.read_sql(sa.select(training_data), conn, index_col="id", dtype=TABLE_DTYPES)
+    assert dataframe.index.tolist() == ids + [ids[-1] + 1]
+    pd.testing.assert_frame_equal(
+        dataframe.iloc[:3].reset_index(drop=True), legacy_frame(), check_index_type=False, check_names=False
+    )
+    assert sa.inspect(engine).get_table_names() == [
+        "training_daily_rollup",
+        "training_data",
+        "training_distinct_values",
+    ]
+
+
+def test_filtered_query_uses_index() -> None:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    stmt = sa.select(training_data).where(training_data.c.user == "user1", training_data.c.upload_time > "2024")
+    with engine.begin() as conn:
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {stmt.compile(compile_kwargs={'literal_binds': True})}"
+        ).fetchall()
+    assert "ix_training_data_user_time" in str(plan)
+
+
+def rollup(engine: sa.engine.Engine) -> list:
+    with engine.begin() as conn:
+        return conn.execute(
+            sa.select(training_daily_rollup).order_by(*training_daily_rollup.primary_key.columns)
+        ).all()
+
+
+def test_rollup_backfill_and_trigger() -> None:
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        legacy_frame().to_sql("training_data", conn)
+    ensure_schema(engine)
+    assert [row.count for row in rollup(engine)] == [1, 1, 1]
+    with engine.begin() as conn:
+        conn.execute(training_data.insert(), [legacy_frame().iloc[0].to_dict()] * 2)
+    assert rollup(engine)[0] == (datetime.date(2024, 6, 1), "user1", "basic", "d", "d", True, 3)
+    assert sum(row.count for row in rollup(engine)) == 5
+
+
+def test_rebuild_rollup_keeps_compacted_dates() -> None:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    old = legacy_frame().assign(upload_time=datetime.datetime(2023, 1, 1))
+    with engine.begin() as conn:
+        conn.execute(training_data.insert(), old.to_dict("records") + legacy_frame().to_dict("records"))
+        conn.execute(sa.delete(training_data).where(training_data.c.upload_time < datetime.datetime(2024, 1, 1)))
+        conn.execute(sa.update(training_daily_rollup).values(count=10))
+        assert rebuild_rollup(conn) == 3
+    counts = {(row.date, row.user, row.training_type): row.count for row in rollup(engine)}
+    assert counts[(datetime.date(2023, 1, 1), "user1", "basic")] == 10
+    assert counts[(datetime.date(2024, 6, 1), "user1", "basic")] == 1
+
+
+def distinct_values(engine: sa.engine.Engine) -> set:
+    with engine.begin() as conn:
+        return set(conn.execute(sa.select(training_distinct_values)).tuples())
+
+
+def test_distinct_values_backfill_and_trigger() -> None:
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        legacy_frame().to_sql("training_data", conn)
+    ensure_schema(engine)
+    assert distinct_values(engine) == {
+        ("user", "user1"),
+        ("user", "user2"),
+        ("training_type", "basic"),
+        ("training_type", "soft"),
+        ("training_type", "hard"),
+    }
+    with engine.begin() as conn:
+        conn.execute(
+            training_data.insert(),
+            [{"user": "user3", "training_type": None}, {"user": "user1", "training_type": None}],
+        )
+        conn.execute(sa.delete(training_data))
+        conn.execute(sa.delete(training_distinct_values))
+        assert rebuild_distinct_values(conn) == 5
+    assert ("user", "user3") not in distinct_values(engine)
+    assert len(distinct_values(engine)) == 5
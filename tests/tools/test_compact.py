@@ -0,0 +1,70 @@
+"""Test the compaction of old training answers."""
+
+import datetime
+import json
+
+import sqlalchemy as sa
+
+from src import ensure_schema, training_daily_rollup, training_data
+from src.app import ui_callbacks as ui
+from src.stats.create_plots import main_plot
+from src.tools.compact import compact, schedule_compaction
+
+
+def insert(engine: sa.engine.Engine) -> None:
+    record = {"training_type": "basic", "correct_move": "s", "guessed_move": "s", "card1": "T", "card2": "8"}
+    rows = [
+        {**record, "user": user, "was_correct": day % 2 == 0, "upload_time": datetime.datetime(2024, 6, day, 12)}
+        for day in range(1, 11)
+        for user in ("user1", "user2")
+    ]
+    with engine.begin() as conn:
+        conn.execute(training_data.insert(), rows)
+
+
+def figures(engine: sa.engine.Engine) -> list:
+    plots = main_plot(None, ["user1", "user2"], ["basic"], ["s"], False, engine)
+    return [json.loads(fig.to_json()) for modes in plots.values() for fig in modes.values()]
+
+
+def test_compact_keeps_statistics() -> None:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    insert(engine)
+    before = figures(engine)
+    assert compact(engine, days=3, today=datetime.date(2024, 6, 10)) == 14
+    with engine.begin() as conn:
+        dates = conn.execute(sa.select(sa.func.min(training_data.c.upload_time))).scalar()
+        assert dates == datetime.datetime(2024, 6, 8, 12)
+        assert conn.execute(sa.select(sa.func.sum(training_daily_rollup.c["count"]))).scalar() == 20
+    assert figures(engine) == before
+    assert compact(engine, days=3, today=datetime.date(2024, 6, 10)) == 0
+
+
+def test_schedule_disabled() -> None:
+    assert schedule_compaction(sa.create_engine("sqlite://"), days=0) is None
+
+
+def test_dashboard_after_compacting_everything() -> None:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    insert(engine)
+    assert compact(engine, days=1, today=datetime.date(2024, 7, 1)) == 20
+    version = ui.load_data(1, None, engine)
+    assert version == "0.20"
+    graphs = ui.plot_data_callback(version, False, False, False, [], [], [], "absolute values", engine)
+    assert len(graphs) == 2
+    assert ui.populate_dropdowns(version, engine) == (["user1", "user2"], ["basic"])
+
+
+def test_compact_keeps_totals_of_imported_rows() -> None:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    insert(engine)
+    assert compact(engine, days=3, today=datetime.date(2024, 6, 10)) == 14
+    insert(engine)
+    assert compact(engine, days=3, today=datetime.date(2024, 6, 10)) == 14
+    with engine.begin() as conn:
+        assert conn.execute(sa.select(sa.func.sum(training_daily_rollup.c["count"]))).scalar() == 40
+        first_day = training_daily_rollup.c.date == "2024-06-01"
+        assert conn.execute(sa.select(sa.func.sum(training_daily_rollup.c["count"])).where(first_day)).scalar() == 4
@@ -0,0 +1,67 @@
+"""Test the training data export and import."""
+
+import datetime
+import pathlib
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from src import TABLE_DTYPES, ensure_schema, training_daily_rollup, training_data
+from src.storage.columnar import AnswerLog
+from src.tools.data import export_data, file_format, import_data
+
+
+def source_engine(rows: int) -> sa.engine.Engine:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    records = [
+        {
+            "user": f"user{i % 3}",
+            "training_type": "basic",
+            "was_correct": i % 2 == 0,
+            "correct_move": "s",
+            "guessed_move": None if i == 5 else "h",
+            "card1": "T",
+            "card2": str(2 + i % 8),
+            "hand_value": 12 + i % 8,
+            "dealer_card": 2 + i % 10,
+            "upload_time": datetime.datetime(2024, 6, 1, 12, 30, 15, 123456) + datetime.timedelta(days=i % 4),
+        }
+        for i in range(rows)
+    ]
+    with engine.begin() as conn:
+        conn.execute(training_data.insert(), records)
+    return engine
+
+
+def read_all(engine: sa.engine.Engine) -> pd.DataFrame:
+    with engine.begin() as conn:
+        return pd.read_sql(sa.select(training_data), conn, index_col="id", dtype=TABLE_DTYPES)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+def test_export_import_roundtrip(tmp_path: pathlib.Path, suffix: str) -> None:
+    source = source_engine(95)
+    path = tmp_path / f"export{suffix}"
+    assert export_data(source, path, chunksize=10) == 95
+    target = sa.create_engine("sqlite://")
+    assert import_data(target, path, chunksize=20) == 95
+    pd.testing.assert_frame_equal(read_all(target), read_all(source))
+    with target.begin() as conn:
+        assert conn.execute(sa.select(sa.func.sum(training_daily_rollup.c["count"]))).scalar() == 95
+
+
+def test_import_into_answer_log(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "export.csv"
+    export_data(source_engine(30), path, chunksize=7)
+    log = AnswerLog(tmp_path / "log")
+    assert import_data(log, path, chunksize=8) == 30
+    assert export_data(log, tmp_path / "log.csv", chunksize=9) == 30
+    assert len(pd.read_csv(tmp_path / "log.csv")) == 30
+
+
+def test_file_format() -> None:
+    assert file_format(pathlib.Path("a.JSONL")) == "jsonl"
+    with pytest.raises(ValueError):
+        file_format(pathlib.Path("a.parquet"))
@@ -0,0 +1,22 @@
+"""Test the rollup backfill command."""
+
+import datetime
+
+import sqlalchemy as sa
+
+from src import ensure_schema, training_daily_rollup, training_data
+from src.tools.rollup import backfill
+
+
+def test_backfill() -> None:
+    engine = sa.create_engine("sqlite://")
+    ensure_schema(engine)
+    record = {"user": "user1", "training_type": "basic", "was_correct": True, "correct_move": "s", "guessed_move": "s"}
+    with engine.begin() as conn:
+        conn.execute(
+            training_data.insert(), [{**record, "upload_time": datetime.datetime(2024, 6, d)} for d in (1, 1, 2)]
+        )
+        conn.execute(sa.delete(training_daily_rollup))
+    assert backfill(engine) == 2
+    with engine.begin() as conn:
+        assert conn.execute(sa.select(training_daily_rollup.c["count"])).scalars().all() == [2, 1]